@@ -0,0 +1,47 @@
+import traceback
+from collections import namedtuple
+
+Shift_Assigned = namedtuple("Shift_Assigned", ["employee_id", "shift_id", "status"])
+Shift_Unassigned = namedtuple("Shift_Unassigned", ["employee_id", "shift_id"])
+Shift_Published = namedtuple("Shift_Published", ["employee_id", "shift_id"])
+Week_Published = namedtuple("Week_Published", ["business_id", "days", "count"])
+Shifts_Reassigned = namedtuple("Shifts_Reassigned", ["removed", "added", "status"])
+Shift_Added = namedtuple("Shift_Added", ["shift_id", "business_id", "shift_date"])
+Shift_Deleted = namedtuple("Shift_Deleted", ["shift_id"])
+Shifts_Deleted = namedtuple("Shifts_Deleted", ["shift_ids"])
+Time_Off_Status_Changed = namedtuple("Time_Off_Status_Changed", ["time_id", "status_id"])
+Employee_Updated = namedtuple("Employee_Updated", ["employee_id"])
+
+subscribers = []
+
+
+def subscribe(callback, *event_types):
+    """
+    Call the callback with every change event of the given types, or with every event if no types are given.
+    """
+
+    subscribers.append((callback, event_types))
+
+
+def unsubscribe(callback):
+    """
+    Stop sending change events to a callback.
+    """
+
+    subscribers[:] = [(subscriber, event_types) for subscriber, event_types in subscribers if subscriber != callback]
+
+
+def publish(event):
+    """
+    Send a change event to everything subscribed to its type.
+    A failing subscriber is reported without stopping the others, as the change has already been saved.
+    """
+
+    for callback, event_types in list(subscribers):
+        if event_types and not isinstance(event, event_types):
+            continue
+
+        try:
+            callback(event)
+        except Exception:
+            traceback.print_exc()
@@ -1,11 +1,53 @@
-import sqlite3, os, Password_Hasher, re
+import sqlite3, os, re, threading, time, Change_Bus
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
+from functools import lru_cache
 
 DAYS_OF_WEEK = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+LOOKUP_CACHE_SIZE = 256
+HASH_WORKERS = os.cpu_count() or 1
+EMPLOYEE_FIELDS = ("employee_id", "business_id", "first_name", "last_name", "email", "phone_number", "position_id", "hourly_rate", "hire_date", "minimum_hours", "maximum_hours", "password_hashed")
+EMAIL_PATTERN = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
+PHONE_PATTERN = r"^\+?\d{1,3}[-.\s]?\(?\d{1,4}\)?[-.\s]?\d{1,4}[-.\s]?\d{1,9}$"
+tables_upgraded = False
+tables_upgraded_lock = threading.Lock()
+data_version = 0
+data_version_lock = threading.Lock()
+
+class Tracked_Connection(sqlite3.Connection):
+    """
+    A database connection that counts every commit which changed data, so pages can tell when they are out of date.
+    The count is shared by connections on every thread, so it is only changed while holding data_version_lock.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.committed_changes = 0
+
+
+    def commit(self):
+        global data_version
+
+        super().commit()
+
+        if self.total_changes != self.committed_changes:
+            self.committed_changes = self.total_changes
+            with data_version_lock:
+                data_version += 1
+
+
+def get_data_version():
+    """
+    Return a number that goes up every time data in the database is changed by this program.
+    """
+
+    return data_version
+
 
 def create_tables():
     """
     Initialise the database, create the tables and add the statuses to the table.
+    Any lookups cached from a previous database file are dropped.
     """
     
     connectionHandler = sqlite3.connect('Database.db')
@@ -19,6 +61,9 @@ def create_tables():
     cursor.execute("CREATE TABLE Employee_Shifts(employee_id INTEGER, shift_id INTEGER, status INTEGER, notes TEXT, PRIMARY KEY (employee_id, shift_id))")
     cursor.execute("CREATE TABLE Statuses(status_id INTEGER PRIMARY KEY, name TEXT)")
     cursor.execute("CREATE TABLE Time_Off(timeoff_id INTEGER PRIMARY KEY, employee_id INTEGER, start_date TEXT, end_date Text, start_time TEXT, end_time Text, status_id INTEGER, notes TEXT)")    
+    cursor.execute("CREATE TABLE Employee_Photos(employee_id INTEGER PRIMARY KEY, photo BLOB)")
+    cursor.execute("CREATE TABLE Employee_Thumbnails(employee_id INTEGER PRIMARY KEY, thumbnail BLOB)")
+    cursor.execute("CREATE TABLE Settings(key TEXT PRIMARY KEY, value TEXT)")
     
     stati = ['Pending', 'Approved', 'Rejected', 'Published']
     for status in stati:
@@ -27,21 +72,76 @@ def create_tables():
     connectionHandler.commit()
     connectionHandler.close()
 
+    clear_lookup_caches()
+
+
+def upgrade_tables(cursor, connectionHandler):
+    """
+    Add any tables and indexes introduced since the database was first created, and load the saved password hashing settings.
+    Photos still held in the Employees table are moved into Employee_Photos so employee lookups never read image data.
+    The cached reference lookups are emptied so nothing read before the upgrade is reused.
+    """
+
+    cursor.execute("CREATE TABLE IF NOT EXISTS Employee_Photos(employee_id INTEGER PRIMARY KEY, photo BLOB)")
+    cursor.execute("CREATE TABLE IF NOT EXISTS Employee_Thumbnails(employee_id INTEGER PRIMARY KEY, thumbnail BLOB)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS Shifts_Business_Date ON Shifts(business_id, shift_date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS Employee_Shifts_Shift ON Employee_Shifts(shift_id)")
+    cursor.execute("CREATE TABLE IF NOT EXISTS Settings(key TEXT PRIMARY KEY, value TEXT)")
+
+    load_password_settings(cursor)
+
+    cursor.execute("INSERT OR REPLACE INTO Employee_Photos(employee_id, photo) SELECT employee_id, photo FROM Employees WHERE photo IS NOT NULL")
+    moved_photos = cursor.execute("UPDATE Employees SET photo = NULL WHERE photo IS NOT NULL").rowcount
+
+    connectionHandler.commit()
+
+    if moved_photos:
+        cursor.execute("VACUUM")
+
+    clear_lookup_caches()
+
+
+def load_password_settings(cursor):
+    """
+    Use the password hashing settings saved in the database, calibrating them for this computer and saving them the first time.
+    """
+
+    import Password_Hasher
+
+    saved_settings = cursor.execute("SELECT value FROM Settings WHERE key = 'password_hashing'").fetchone()
+
+    if saved_settings is None:
+        settings = Password_Hasher.calibrate()
+        cursor.execute("INSERT INTO Settings(key, value) VALUES ('password_hashing', ?)", (Password_Hasher.describe(settings),))
+    else:
+        settings = Password_Hasher.read_settings(saved_settings[0])
+
+    Password_Hasher.use_settings(settings)
+
 
 def connect_to_database():
     """
     Connect to the database so that it can be accessed and ammended.
+    The tables are upgraded by the first connection only, holding tables_upgraded_lock so worker threads wait for it to finish.
     """
 
+    global tables_upgraded
+
     if not os.path.isfile("Database.db"):
         create_tables()  
-        connectionHandler = sqlite3.connect('Database.db')
+        connectionHandler = sqlite3.connect('Database.db', factory=Tracked_Connection)
         cursor = connectionHandler.cursor()
 
     else:
-        connectionHandler = sqlite3.connect('Database.db')
+        connectionHandler = sqlite3.connect('Database.db', factory=Tracked_Connection)
         cursor = connectionHandler.cursor()
 
+    if not tables_upgraded:
+        with tables_upgraded_lock:
+            if not tables_upgraded:
+                upgrade_tables(cursor, connectionHandler)
+                tables_upgraded = True
+
     return cursor, connectionHandler
 
 
@@ -56,25 +156,92 @@ def add_business(business_name, business_address):
     connectionHandler.commit()
     connectionHandler.close()
 
+    find_business.cache_clear()
+
 
 def add_employee(business_id, first_name, last_name, email, phone_number, position_id, hourly_rate, photo, minimum_hours, maximum_hours, password):  
     """
     Adds a new employees information to the database.
     """
 
+    import Password_Hasher
+
     cursor, connectionHandler = connect_to_database()
 
     hire_date = date.today()
     password_hashed = Password_Hasher.hash_password(password)
-    if photo == None:
-        pass
-        #photo = image_to_blob('UserImage.jpg')
-    cursor.execute(f"INSERT INTO Employees(business_id, first_name, last_name, email, phone_number, position_id, hourly_rate, hire_date, photo, minimum_hours, maximum_hours, password_hashed) VALUES ('{business_id}', '{first_name}', '{last_name}', '{email}', '{phone_number}', '{position_id}', '{hourly_rate}', '{hire_date}', ?, '{minimum_hours}', '{maximum_hours}', '{password_hashed}')", ([photo]))
+    cursor.execute(f"INSERT INTO Employees(business_id, first_name, last_name, email, phone_number, position_id, hourly_rate, hire_date, minimum_hours, maximum_hours, password_hashed) VALUES ('{business_id}', '{first_name}', '{last_name}', '{email}', '{phone_number}', '{position_id}', '{hourly_rate}', '{hire_date}', '{minimum_hours}', '{maximum_hours}', '{password_hashed}')")
+    if photo != None:
+        cursor.execute("INSERT INTO Employee_Photos(employee_id, photo) VALUES (?, ?)", (cursor.lastrowid, photo))
     
     connectionHandler.commit()
     connectionHandler.close()
 
 
+def hash_passwords(passwords, progress=None):
+    """
+    Hash many passwords at once across a thread pool, as hashlib releases the GIL while it works.
+    """
+
+    import Password_Hasher
+
+    progress = progress or (lambda percent: None)
+    passwords = [str(password) for password in passwords]
+    hashes = []
+
+    with ThreadPoolExecutor(max_workers=HASH_WORKERS) as pool:
+        for password_hashed in pool.map(Password_Hasher.hash_password, passwords):
+            hashes.append(password_hashed)
+            progress(len(hashes) * 100 // len(passwords))
+
+    return hashes
+
+
+def add_employees(business_id, employees, progress=None):
+    """
+    Add many employees in one transaction, hashing their passwords in parallel.
+    Each employee is a tuple of the add_employee arguments after the business id.
+    Returns the number added and the number added per second.
+    """
+
+    employees = list(employees)
+    if employees == []:
+        return 0, 0.0
+
+    start = time.perf_counter()
+    hire_date = str(date.today())
+    password_hashes = hash_passwords([employee[-1] for employee in employees], progress)
+
+    rows = []
+    rows_with_photos = []
+    for (first_name, last_name, email, phone_number, position_id, hourly_rate, photo, minimum_hours, maximum_hours, password), password_hashed in zip(employees, password_hashes):
+        row = (business_id, first_name, last_name, email, phone_number, position_id, hourly_rate, hire_date, minimum_hours, maximum_hours, password_hashed)
+        if photo == None:
+            rows.append(row)
+        else:
+            rows_with_photos.append((row, photo))
+
+    insert_employee = "INSERT INTO Employees(business_id, first_name, last_name, email, phone_number, position_id, hourly_rate, hire_date, minimum_hours, maximum_hours, password_hashed) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    cursor, connectionHandler = connect_to_database()
+
+    try:
+        cursor.executemany(insert_employee, rows)
+        for row, photo in rows_with_photos:
+            cursor.execute(insert_employee, row)
+            cursor.execute("INSERT INTO Employee_Photos(employee_id, photo) VALUES (?, ?)", (cursor.lastrowid, photo))
+
+        connectionHandler.commit()
+
+    except sqlite3.Error:
+        connectionHandler.rollback()
+        raise
+
+    finally:
+        connectionHandler.close()
+
+    return len(employees), len(employees) / (time.perf_counter() - start)
+
+
 def add_position(business_id, position_name, position_description):
     """
     Add a job position to the business and return its id.
@@ -88,6 +255,9 @@ def add_position(business_id, position_name, position_description):
     connectionHandler.commit()
     connectionHandler.close()
 
+    find_position.cache_clear()
+    find_position_id.cache_clear()
+
     return position_id[0]
 
 
@@ -99,32 +269,43 @@ def add_shift(business_id, position, num_employees, shift_date, start_time, end_
     cursor, connectionHandler = connect_to_database()
 
     cursor.execute(f"INSERT INTO Shifts(business_id, start_time, end_time, shift_date, employees, role_required) VALUES ('{business_id}','{start_time}','{end_time}','{shift_date}','{num_employees}','{position}')")
+    shift_id = cursor.lastrowid
 
     connectionHandler.commit()
     connectionHandler.close()
 
+    Change_Bus.publish(Change_Bus.Shift_Added(shift_id, business_id, shift_date))
+
+
+def valid_contact_details(email, phone_number):
+    """
+    Check that an email address and phone number look real, where None means the detail was not given.
+    """
+
+    return (email is None or bool(re.match(EMAIL_PATTERN, email))) and (phone_number is None or bool(re.match(PHONE_PATTERN, phone_number)))
+
 
-def update_employee(first_name, last_name, email, phone_number, hourly_rate, minimum_hours, maximum_hours, file_path, id):
+def update_employee(first_name, last_name, email, phone_number, hourly_rate, minimum_hours, maximum_hours, file_path, id, thumbnail=None):
     """
     Update an employee's profile with newly entered information.
+
+    When a new photo is chosen its pre-rendered thumbnail is stored alongside it, or the old thumbnail is removed so it can be rebuilt.
     """
 
     fields = ['first_name', 'last_name', 'email', 'phone_number', 'hourly_rate', 'minimum_hours', 'maximum_hours']
     updated_details = [first_name, last_name, email, phone_number, hourly_rate, minimum_hours, maximum_hours]
-    email_pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-    phone_pattern = r"^\+?\d{1,3}[-.\s]?\(?\d{1,4}\)?[-.\s]?\d{1,4}[-.\s]?\d{1,9}$"
 
     try:
         cursor, connection = connect_to_database()
 
         id = str(id)
         current_details = cursor.execute(
-            f"SELECT first_name, last_name, email, phone_number, hourly_rate, minimum_hours, maximum_hours, photo FROM employees WHERE employee_id = {id}").fetchone()
+            f"SELECT first_name, last_name, email, phone_number, hourly_rate, minimum_hours, maximum_hours FROM employees WHERE employee_id = {id}").fetchone()
 
         if not current_details:
             return False
 
-        new_details = [new if new != '' else current for new, current in zip(updated_details, current_details[:-1])]
+        new_details = [new if new != '' else current for new, current in zip(updated_details, current_details)]
         
         new_details = [None if val == 'None' else val for val in new_details]
 
@@ -139,20 +320,29 @@ def update_employee(first_name, last_name, email, phone_number, hourly_rate, min
                     return False
 
         try:
-            new_photo = image_to_blob(file_path) if file_path else current_details[-1]
+            new_photo = image_to_blob(file_path) if file_path else None
         except Exception:
-            new_photo = current_details[-1]
+            new_photo = None
         
-        if (new_details[5] is None or new_details[6] is None or (new_details[5] is not None and new_details[6] is not None and new_details[5] < new_details[6])) and (new_details[3] is None or bool(re.match(phone_pattern, new_details[3]))) and (new_details[2] is None or bool(re.match(email_pattern, new_details[2]))):
+        if (new_details[5] is None or new_details[6] is None or (new_details[5] is not None and new_details[6] is not None and new_details[5] < new_details[6])) and valid_contact_details(new_details[2], new_details[3]):
             update_query = f"""
                 UPDATE employees
-                SET {', '.join(f"{field} = ?" for field in fields)}, photo = ?
+                SET {', '.join(f"{field} = ?" for field in fields)}
                 WHERE employee_id = ?
             """
-            cursor.execute(update_query, (*new_details, new_photo, id))
+            cursor.execute(update_query, (*new_details, id))
+
+            if new_photo is not None:
+                cursor.execute("INSERT OR REPLACE INTO Employee_Photos(employee_id, photo) VALUES (?, ?)", (id, new_photo))
+                if thumbnail:
+                    cursor.execute("INSERT OR REPLACE INTO Employee_Thumbnails(employee_id, thumbnail) VALUES (?, ?)", (id, thumbnail))
+                else:
+                    cursor.execute("DELETE FROM Employee_Thumbnails WHERE employee_id = ?", (id,))
         
             connection.commit()
             connection.close()
+
+            Change_Bus.publish(Change_Bus.Employee_Updated(int(id)))
         else:
             connection.commit()
             connection.close()
@@ -166,6 +356,8 @@ def update_password(password, employee_id):
     """
     Update the password to an employees account
     """
+    import Password_Hasher
+
     cursor, connectionHandler = connect_to_database()
 
     password_hashed = Password_Hasher.hash_password(str(password))
@@ -176,6 +368,60 @@ def update_password(password, employee_id):
     connectionHandler.close()
 
 
+def update_passwords(passwords, progress=None):
+    """
+    Update the passwords of many employees in one transaction, hashing them in parallel.
+    Takes a dictionary of new passwords keyed by employee id and returns the number updated and the number updated per second.
+    """
+
+    if not passwords:
+        return 0, 0.0
+
+    start = time.perf_counter()
+    employee_ids = [int(employee_id) for employee_id in passwords]
+    password_hashes = hash_passwords(passwords.values(), progress)
+
+    cursor, connectionHandler = connect_to_database()
+
+    try:
+        cursor.executemany("UPDATE Employees SET password_hashed = ? WHERE employee_id = ?", zip(password_hashes, employee_ids))
+        connectionHandler.commit()
+
+    except sqlite3.Error:
+        connectionHandler.rollback()
+        raise
+
+    finally:
+        connectionHandler.close()
+
+    return len(employee_ids), len(employee_ids) / (time.perf_counter() - start)
+
+
+def check_password(password, employee_id):
+    """
+    Check an entered password against the one stored for an employee.
+    """
+
+    import Password_Hasher
+
+    stored_password = find_employee_fields(employee_id, "password_hashed")["password_hashed"]
+
+    return Password_Hasher.verify_password(str(password), stored_password)
+
+
+def change_password(current_password, new_password, employee_id):
+    """
+    Replace an employees password if the current password entered is correct, returning whether it was changed.
+    """
+
+    if not check_password(current_password, employee_id):
+        return False
+
+    update_password(new_password, employee_id)
+
+    return True
+
+
 def update_time_off_status(status_id, time_id):
     """
     Update the status of a time off request.
@@ -188,6 +434,8 @@ def update_time_off_status(status_id, time_id):
     connectionHandler.commit()
     connectionHandler.close()
 
+    Change_Bus.publish(Change_Bus.Time_Off_Status_Changed(time_id, status_id))
+
 
 def add_time_off(employee_id, start_date, end_date, start_time, end_time, status_id, notes):
     """
@@ -214,18 +462,24 @@ def assign_shift(employee_id, shift_id, shift_status):
     connectionHandler.commit()
     connectionHandler.close()
 
+    Change_Bus.publish(Change_Bus.Shift_Assigned(employee_id, shift_id, shift_status))
+
 
 def employee_login(first_name, last_name, password):
     """
     Check the details of an employee against those entered to verify a login.
     """
 
+    import Password_Hasher
+
     cursor, connectionHandler = connect_to_database()
 
     try:
         id, employees_password =cursor.execute(f"""SELECT employee_id, password_hashed FROM Employees WHERE first_name = '{first_name}' AND last_name = '{last_name}'""").fetchone()
     
         if Password_Hasher.verify_password(str(password),employees_password):
+            if Password_Hasher.needs_rehash(employees_password):
+                threading.Thread(target=rehash_password, args=(str(password), employees_password, id), daemon=True).start()
             return id, True
         
         return None, False
@@ -234,6 +488,23 @@ def employee_login(first_name, last_name, password):
         return None, False
 
 
+def rehash_password(password, old_password_hashed, employee_id):
+    """
+    Replace an employees stored hash with one using the current settings, unless the password was changed in the meantime.
+    """
+
+    import Password_Hasher
+
+    password_hashed = Password_Hasher.hash_password(password)
+
+    cursor, connectionHandler = connect_to_database()
+
+    cursor.execute("UPDATE Employees SET password_hashed = ? WHERE employee_id = ? AND password_hashed = ?", (password_hashed, int(employee_id), old_password_hashed))
+
+    connectionHandler.commit()
+    connectionHandler.close()
+
+
 def find_new_business():
     """
     Return the ID of the latest created business.
@@ -258,6 +529,7 @@ def find_new_employee():
     return business_id[0]
 
 
+@lru_cache(maxsize=LOOKUP_CACHE_SIZE)
 def find_status_name(id):
     """
     Find the title of a status from its ID.
@@ -270,42 +542,110 @@ def find_status_name(id):
     return status
 
 
-def find_employee(id):
+def employee_projection(fields):
+    """
+    Build the column list for an employee query, only allowing known non-image columns.
+    """
+
+    if not fields:
+        raise ValueError("At least one employee field is needed")
+
+    for field in fields:
+        if field not in EMPLOYEE_FIELDS:
+            raise ValueError(f"Unknown employee field: {field}")
+
+    return ", ".join(fields)
+
+
+def find_employee_fields(id, *fields):
     """
-    Return the information of an employee found by their ID
+    Return only the chosen columns of an employee, accessible by name or position, or None if they do not exist.
     """
 
     cursor, connectionHandler = connect_to_database()
+    connectionHandler.row_factory = sqlite3.Row
+    cursor = connectionHandler.cursor()
 
-    details = cursor.execute(f"SELECT * FROM Employees WHERE employee_id = '{id}'").fetchmany()[0]
+    details = cursor.execute(f"SELECT {employee_projection(fields)} FROM Employees WHERE employee_id = ?", (id,)).fetchone()
+
+    connectionHandler.close()
 
     return details
 
 
-def find_num_of_employees_working(id):
+def find_employee_business(id):
     """
-    Return the number of employees working on a shift
+    Return the id of the business an employee works for.
+    """
+
+    return find_employee_fields(id, "business_id")["business_id"]
+
+
+def find_employee_photo(id):
+    """
+    Return the full size photo of an employee, or None if they have not got one.
     """
 
     cursor, connectionHandler = connect_to_database()
 
-    details = cursor.execute(f"SELECT * FROM Employee_Shifts WHERE shift_id = '{id}'").fetchall()
+    photo = cursor.execute("SELECT photo FROM Employee_Photos WHERE employee_id = ?", (id,)).fetchone()
+
+    connectionHandler.close()
 
-    return len(details)
+    return photo[0] if photo else None
 
 
-def find_employee_id(first_name, last_name):
+def find_employee_thumbnail(id):
     """
-    Return the ID of an employee found by their name
+    Return the pre-rendered circular thumbnail of an employee's photo, or None if it has not been made yet.
     """
 
     cursor, connectionHandler = connect_to_database()
 
-    id = cursor.execute(f"SELECT employee_id FROM Employees WHERE first_name = '{str(first_name)}' and last_name = '{str(last_name)}'").fetchone()
+    thumbnail = cursor.execute("SELECT thumbnail FROM Employee_Thumbnails WHERE employee_id = ?", (id,)).fetchone()
 
-    return id
+    connectionHandler.close()
+
+    return thumbnail[0] if thumbnail else None
+
+
+def save_employee_thumbnail(id, thumbnail):
+    """
+    Store the pre-rendered circular thumbnail of an employee's photo.
+    """
+
+    cursor, connectionHandler = connect_to_database()
+
+    cursor.execute("INSERT OR REPLACE INTO Employee_Thumbnails(employee_id, thumbnail) VALUES (?, ?)", (id, thumbnail))
+
+    connectionHandler.commit()
+    connectionHandler.close()
+
+
+def find_shift_staffing(shift_ids):
+    """
+    Return the number of employees working each of the given shifts
+    """
 
+    shift_ids = list(shift_ids)
+    if shift_ids == []:
+        return {}
 
+    cursor, connectionHandler = connect_to_database()
+
+    placeholders = ", ".join("?" for _ in shift_ids)
+    counts = cursor.execute(f"SELECT shift_id, COUNT(*) FROM Employee_Shifts WHERE shift_id IN ({placeholders}) GROUP BY shift_id", shift_ids).fetchall()
+
+    connectionHandler.commit()
+    connectionHandler.close()
+
+    staffing = {shift_id: 0 for shift_id in shift_ids}
+    staffing.update(dict(counts))
+
+    return staffing
+
+
+@lru_cache(maxsize=LOOKUP_CACHE_SIZE)
 def find_business(id):
     """
     Return the information of a business found by it's ID
@@ -318,6 +658,7 @@ def find_business(id):
     return details[0]
 
 
+@lru_cache(maxsize=LOOKUP_CACHE_SIZE)
 def find_position(id):
     """
     Return the name of a position found by its ID
@@ -362,42 +703,56 @@ def find_if_employee_available(employee_id, shift_id):
     return True
 
 
+@lru_cache(maxsize=LOOKUP_CACHE_SIZE)
 def find_position_id(name, business_id):
     """
-    Return the ID of a position given it's name and its business_id
+    Return the ID of a position given it's name and its business_id, or None if the business has no such position
     """
 
     cursor, connectionHandler = connect_to_database()
 
-    details = cursor.execute(f"SELECT position_id FROM Positions WHERE position_name = '{name}' and business_id = '{business_id}'").fetchone()
+    details = cursor.execute("SELECT position_id FROM Positions WHERE position_name = ? and business_id = ?", (name, business_id)).fetchone()
 
-    return details[0]
+    return details[0] if details else None
 
 
-def get_assigned_shifts(business_id, day):
+def get_assigned_shift_details(business_id, days):
     """
-    Find all shifts that have been assigned on a given day.
+    Get the day, times and status of every assignment in a business on the given days.
     """
 
-    cursor, connectionHandler = connect_to_database()
-    all_shifts = []
-    assigned_shifts = []
-    shift_ids = cursor.execute(f"SELECT shift_id FROM Shifts WHERE business_id = '{int(business_id)}' and shift_date = '{str(day)}'").fetchall()
+    days = list(days)
+    if days == []:
+        return {}
 
-    for i in range (len(shift_ids)):
-        all_shifts.append(shift_ids[i][0])
+    cursor, connectionHandler = connect_to_database()
 
-    if all_shifts != []:
-        for j in range(len(all_shifts)):
-            employee_id = cursor.execute(f"SELECT employee_id FROM Employee_Shifts WHERE shift_id = '{all_shifts[j]}' ").fetchall()
-            if employee_id != []:
-                for i in range(len(employee_id)):
-                    assigned_shifts.append([employee_id[i][0], all_shifts[j]])
+    placeholders = ", ".join("?" for _ in days)
+    rows = cursor.execute(f"""SELECT Employee_Shifts.employee_id, Shifts.shift_id, Shifts.shift_date, Shifts.start_time, Shifts.end_time, Employee_Shifts.status FROM Employee_Shifts JOIN Shifts ON Shifts.shift_id = Employee_Shifts.shift_id WHERE Shifts.business_id = ? AND Shifts.shift_date IN ({placeholders})""", [int(business_id)] + days).fetchall()
 
     connectionHandler.commit()
     connectionHandler.close()
 
-    return assigned_shifts
+    return rows
+
+
+def get_published_shifts(employee_id, days):
+    """
+    Get the day and times of an employee's published shifts on the given days.
+    """
+
+    days = list(days)
+    if days == []:
+        return []
+
+    cursor, connectionHandler = connect_to_database()
+
+    placeholders = ", ".join("?" for _ in days)
+    rows = cursor.execute(f"""SELECT Shifts.shift_id, Shifts.shift_date, Shifts.start_time, Shifts.end_time FROM Employee_Shifts JOIN Shifts ON Shifts.shift_id = Employee_Shifts.shift_id WHERE Employee_Shifts.employee_id = ? AND Employee_Shifts.status = 4 AND Shifts.shift_date IN ({placeholders})""", [int(employee_id)] + days).fetchall()
+
+    connectionHandler.close()
+
+    return rows
 
 
 def get_positions(business_id):
@@ -419,24 +774,34 @@ def get_positions(business_id):
     return details
 
 
-def get_employees(business_id):
+def get_position_names(business_id):
     """
-    Get the names of an employees in a business.
+    Return a dictionary of the position names within a business keyed by their ID.
     """
 
-    employees = []
-
     cursor, connectionHandler = connect_to_database()
-    
-    employees_raw = cursor.execute(f"SELECT first_name, last_name FROM Employees WHERE business_id = '{business_id}'").fetchall()
+
+    positions = cursor.execute("SELECT position_id, position_name FROM Positions WHERE business_id = ?", (business_id,)).fetchall()
 
     connectionHandler.commit()
     connectionHandler.close()
 
-    for name in employees_raw:
-        employees.append(name[0] + " " + name[1])
+    return dict(positions)
+
+
+def get_roster(business_id):
+    """
+    Get the ID, display name, position and working hours of every employee in a business.
+    """
+
+    cursor, connectionHandler = connect_to_database()
+
+    roster = cursor.execute("SELECT employee_id, first_name || ' ' || last_name, position_id, hourly_rate, minimum_hours, maximum_hours FROM Employees WHERE business_id = ? ORDER BY employee_id", (business_id,)).fetchall()
+
+    connectionHandler.commit()
+    connectionHandler.close()
 
-    return employees
+    return roster
 
 
 def get_shifts(business_id, date):
@@ -469,19 +834,24 @@ def get_shift_times(shift_id):
     return times
 
 
-def get_shift_status(employee_id, shift_id):
+def get_shift_assignments(shift_ids):
     """
-    Get the status of a shift given its ID and the ID of the employee working it.
+    Get the employee ID, shift ID and status of every assignment on the given shifts.
     """
 
+    shift_ids = list(shift_ids)
+    if shift_ids == []:
+        return []
+
     cursor, connectionHandler = connect_to_database()
 
-    status = cursor.execute(f"SELECT status FROM Employee_Shifts WHERE shift_id = '{shift_id}' and employee_id = '{employee_id}'").fetchone()[0]
+    placeholders = ", ".join("?" for _ in shift_ids)
+    assignments = cursor.execute(f"SELECT employee_id, shift_id, status FROM Employee_Shifts WHERE shift_id IN ({placeholders})", shift_ids).fetchall()
 
     connectionHandler.commit()
     connectionHandler.close()
 
-    return status
+    return assignments
 
 
 def get_shift_info(shift_id):
@@ -510,7 +880,7 @@ def get_time_off_info(business_id, date_from):
     final = []
     cyear,cmonth,cday = str(date_from).split("-")
 
-    employee_ids = cursor.execute(f"SELECT employee_id FROM Employees WHERE business_id = '{business_id}'").fetchall()
+    employee_ids = cursor.execute(f"SELECT employee_id FROM Employees WHERE business_id = '{business_id}' ORDER BY employee_id").fetchall()
 
     for id in employee_ids:
         time_off = []
@@ -542,14 +912,12 @@ def get_employee_on_shift(shift_id):
 
     cursor, connectionHandler = connect_to_database()
 
-    employee_details = cursor.execute(f"""SELECT * FROM Employees, Employee_Shifts WHERE Employees.employee_id = Employee_Shifts.employee_id AND Employee_Shifts.shift_id = ?""", ([shift_id])).fetchall()[0]
-
-    firstname, lastname, position_id = employee_details[2], employee_details[3], employee_details[6]
+    employee_id, firstname, lastname, position_id = cursor.execute(f"""SELECT Employees.employee_id, first_name, last_name, position_id FROM Employees, Employee_Shifts WHERE Employees.employee_id = Employee_Shifts.employee_id AND Employee_Shifts.shift_id = ?""", ([shift_id])).fetchall()[0]
 
     connectionHandler.commit()
     connectionHandler.close()
 
-    return firstname, lastname, position_id
+    return employee_id, firstname, lastname, position_id
 
 
 def get_available_employees(business_id, position_id, shift_date, start_time, end_time):
@@ -598,6 +966,32 @@ def remove_employee_from_shift(employee_id, shift_id):
     connectionHandler.commit()
     connectionHandler.close()
 
+    Change_Bus.publish(Change_Bus.Shift_Unassigned(employee_id, shift_id))
+
+
+def apply_shift_changes(to_remove, to_add, shift_status):
+    """
+    Remove and add employee-shift assignments together in a single transaction.
+    """
+
+    to_remove = list(to_remove)
+    to_add = list(to_add)
+    cursor, connectionHandler = connect_to_database()
+
+    try:
+        cursor.executemany("DELETE FROM Employee_Shifts WHERE employee_id = ? and shift_id = ?", to_remove)
+        cursor.executemany("INSERT INTO Employee_Shifts(employee_id, shift_id, status) VALUES (?, ?, ?)", [(employee_id, shift_id, shift_status) for employee_id, shift_id in to_add])
+        connectionHandler.commit()
+
+    except sqlite3.Error:
+        connectionHandler.rollback()
+        raise
+
+    finally:
+        connectionHandler.close()
+
+    Change_Bus.publish(Change_Bus.Shifts_Reassigned(to_remove, to_add, shift_status))
+
 
 def delete_shift(shift_id):
     """
@@ -612,6 +1006,34 @@ def delete_shift(shift_id):
     connectionHandler.commit()
     connectionHandler.close()
 
+    Change_Bus.publish(Change_Bus.Shift_Deleted(shift_id))
+
+
+def delete_shifts(shift_ids):
+    """
+    Deletes several shifts and everyone assigned to them in a single transaction.
+    """
+
+    shift_ids = [(shift_id,) for shift_id in shift_ids]
+    if shift_ids == []:
+        return
+
+    cursor, connectionHandler = connect_to_database()
+
+    try:
+        cursor.executemany("DELETE FROM Employee_Shifts WHERE shift_id = ?", shift_ids)
+        cursor.executemany("DELETE FROM Shifts WHERE shift_id = ?", shift_ids)
+        connectionHandler.commit()
+
+    except sqlite3.Error:
+        connectionHandler.rollback()
+        raise
+
+    finally:
+        connectionHandler.close()
+
+    Change_Bus.publish(Change_Bus.Shifts_Deleted([shift_id for shift_id, in shift_ids]))
+
 
 def delete_employee(id):
     """
@@ -621,6 +1043,8 @@ def delete_employee(id):
     cursor, connectionHandler =connect_to_database()
 
     cursor.execute(f"DELETE FROM Employees WHERE employee_id = '{id}'")
+    cursor.execute(f"DELETE FROM Employee_Photos WHERE employee_id = '{id}'")
+    cursor.execute(f"DELETE FROM Employee_Thumbnails WHERE employee_id = '{id}'")
 
     connectionHandler.commit()
     connectionHandler.close()
@@ -638,6 +1062,49 @@ def publish_shift(shift_id, employee_id):
     connectionHandler.commit()
     connectionHandler.close()
 
+    Change_Bus.publish(Change_Bus.Shift_Published(employee_id, shift_id))
+
+
+def publish_week(business_id, days):
+    """
+    Publish every pending shift assignment of a business on the given days in a single update, returning how many were published.
+    """
+
+    days = list(days)
+    if days == []:
+        return 0
+
+    cursor, connectionHandler = connect_to_database()
+
+    placeholders = ", ".join("?" for _ in days)
+    count = cursor.execute(f"UPDATE Employee_Shifts SET status = 4 WHERE status = 1 AND shift_id IN (SELECT shift_id FROM Shifts WHERE business_id = ? AND shift_date IN ({placeholders}))", [int(business_id)] + days).rowcount
+
+    connectionHandler.commit()
+    connectionHandler.close()
+
+    Change_Bus.publish(Change_Bus.Week_Published(int(business_id), days, count))
+
+    return count
+
+
+def get_lookup_cache_info():
+    """
+    Return the hit and miss counts of the cached reference lookups.
+    """
+
+    lookups = [find_status_name, find_business, find_position, find_position_id]
+
+    return {lookup.__name__: lookup.cache_info() for lookup in lookups}
+
+
+def clear_lookup_caches():
+    """
+    Empty the cached reference lookups so they are read from the database again.
+    """
+
+    for lookup in [find_status_name, find_business, find_position, find_position_id]:
+        lookup.cache_clear()
+
 
 def image_to_blob(filename):
     """
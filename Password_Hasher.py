@@ -1,20 +1,84 @@
-import hashlib, os
+import hashlib, hmac, os, time
 
-def hash_password(password):
+SALT_LENGTH = 16
+LEGACY_ITERATIONS = 100000
+TARGET_LATENCY = 0.25
+
+parameters = {"algorithm": "pbkdf2_sha256", "iterations": 100000}
+
+
+def derive(password, salt, settings):
+    """
+    Derive the digest of a password with the given algorithm and cost settings
+    """
+
+    if settings["algorithm"] == "pbkdf2_sha256":
+        return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, settings["iterations"])
+
+    if settings["algorithm"] == "scrypt":
+        n, r, p = settings["n"], settings["r"], settings["p"]
+        return hashlib.scrypt(password.encode('utf-8'), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + 1024 * 1024)
+
+    raise ValueError(f"Unknown password hashing algorithm {settings['algorithm']}")
+
+
+def cost_names(algorithm):
+    """
+    Return the names of the cost settings an algorithm uses, in the order they are stored
+    """
+
+    return ["n", "r", "p"] if algorithm == "scrypt" else ["iterations"]
+
+
+def describe(settings):
     """
-    Hash a given password
+    Write the algorithm and cost settings as text, such as pbkdf2_sha256$100000
     """
-    
-    salt = os.urandom(16)
 
-    hashed_password = hashlib.pbkdf2_hmac(
-        'sha256',
-        password.encode('utf-8'),
-        salt,
-        100000 
-    )
+    return "$".join([settings["algorithm"], *(str(settings[name]) for name in cost_names(settings["algorithm"]))])
+
+
+def read_settings(description):
+    """
+    Read the algorithm and cost settings back out of text written by describe
+    """
+
+    algorithm, *costs = description.split("$")
+
+    return {"algorithm": algorithm, **dict(zip(cost_names(algorithm), map(int, costs)))}
+
+
+def encode(settings, salt, digest):
+    """
+    Write the algorithm, cost settings, salt and digest into one string so the hash describes how it was made
+    """
+
+    return "$".join([describe(settings), salt.hex(), digest.hex()])
+
+
+def decode(stored_password):
+    """
+    Read the settings, salt and digest back out of a stored hash, including the old salt and hash only hex format
+    """
 
-    return (salt + hashed_password).hex()
+    if "$" not in stored_password:
+        stored_password_bytes = bytes.fromhex(stored_password)
+        return {"algorithm": "pbkdf2_sha256", "iterations": LEGACY_ITERATIONS, "legacy": True}, stored_password_bytes[:16], stored_password_bytes[16:]
+
+    description, salt, digest = stored_password.rsplit("$", 2)
+
+    return read_settings(description), bytes.fromhex(salt), bytes.fromhex(digest)
+
+
+def hash_password(password, settings=None):
+    """
+    Hash a given password with the current settings, or the ones given
+    """
+
+    settings = settings or parameters
+    salt = os.urandom(SALT_LENGTH)
+
+    return encode(settings, salt, derive(password, salt, settings))
 
 
 def verify_password(password, stored_password):
@@ -22,14 +86,57 @@ def verify_password(password, stored_password):
     Confirm if an entered password is the same as a hashed password
     """
 
-    stored_password_bytes = bytes.fromhex(stored_password)
-    salt = stored_password_bytes[:16]
-    stored_hash = stored_password_bytes[16:]
-    new_hash = hashlib.pbkdf2_hmac(
-        'sha256',
-        password.encode('utf-8'),
-        salt,
-        100000
-    )
+    settings, salt, stored_hash = decode(stored_password)
+    new_hash = derive(password, salt, settings)
+
+    return hmac.compare_digest(new_hash, stored_hash)
+
+
+def needs_rehash(stored_password):
+    """
+    Check whether a stored hash was made in the old format, with another algorithm, or with any cost below the current settings
+    """
+
+    settings, _, _ = decode(stored_password)
+
+    if settings.get("legacy") or settings["algorithm"] != parameters["algorithm"]:
+        return True
+
+    return any(settings[name] < parameters[name] for name in cost_names(parameters["algorithm"]))
+
+
+def use_settings(settings):
+    """
+    Make new hashes use the given algorithm and cost settings
+    """
+
+    global parameters
+
+    parameters = dict(settings)
+
+
+def calibrate(algorithm="pbkdf2_sha256", target=TARGET_LATENCY):
+    """
+    Return the cost settings that take about the target number of seconds to verify a password on this computer.
+    Run this once and save the result, as timings vary from run to run.
+    """
+
+    salt = os.urandom(SALT_LENGTH)
+
+    if algorithm == "scrypt":
+        settings = {"algorithm": "scrypt", "n": 2 ** 12, "r": 8, "p": 1}
+        while True:
+            start = time.perf_counter()
+            derive("calibrate", salt, settings)
+            if (time.perf_counter() - start) * 2 > target or settings["n"] >= 2 ** 20:
+                break
+            settings["n"] *= 2
+
+    else:
+        settings = {"algorithm": "pbkdf2_sha256", "iterations": 10000}
+        start = time.perf_counter()
+        derive("calibrate", salt, settings)
+        elapsed = time.perf_counter() - start
+        settings["iterations"] = max(LEGACY_ITERATIONS, int(round(settings["iterations"] * target / elapsed, -3)))
 
-    return new_hash == stored_hash
\ No newline at end of file
+    return settings
@@ -1,36 +1,34 @@
 from datetime import date, timedelta
-import Database_Controller
+import Database_Controller, math, random, time
 
 DAYS_OF_WEEK = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 
+UNFILLED_PENALTY = 1000
+UNDER_HOURS_PENALTY = 10
+
 class Employee:
     """
     Stores information about an employee.
     """
 
-    def __init__(self, id):
+    def __init__(self, id, rate, minimum_hours, maximum_hours):
         """
         Assigns attributes to data given.
         """
 
-        information = Database_Controller.find_employee(id)
-        self.minimum_hours = float(information[10]) if information[10] != None else 0
-        self.maximum_hours = float(information[11]) if information[11] != None else float('inf')
-        self.rate = float(information[7]) if information[7] != None else float('inf')
+        self.id = id
+        self.minimum_hours = float(minimum_hours) if minimum_hours != None else 0
+        self.maximum_hours = float(maximum_hours) if maximum_hours != None else float('inf')
+        self.rate = float(rate) if rate != None else float('inf')
         self.current_hours = 0
         self.scheduled_days = set()  # Track days the employee is scheduled
 
-    def increase_hours(self, shift_id):
+    def increase_hours(self, start_time, end_time):
         """
         Increases the current hours attribute by the length of a shift.
         """
 
-        start_time, end_time, date = Database_Controller.get_shift_times(shift_id)
-        start_hour, start_min = map(int, str(start_time).split("."))
-        end_hour, end_min = map(int, str(end_time).split("."))
-
-        delta_time = ((end_hour * 60 + end_min) - (start_hour * 60 + start_min)) / 60
-        self.current_hours += delta_time
+        self.current_hours += shift_length(start_time, end_time)
 
     def is_available_for_day(self, date):
         """
@@ -45,26 +43,390 @@ class Employee:
         self.scheduled_days.add(date)
 
 
+class Schedule_Improver:
+    """
+    Improves a set of assignments with a simulated annealing local search.
+    Time off, maximum hours and working twice in a day are never broken, while empty places and minimum hours are penalised.
+    """
+
+    def __init__(self, assignments, available_employees, employees, shifts, seed=None):
+        """
+        Build the search state from the greedy assignments.
+        """
+
+        self.random = random.Random(seed)
+        self.shift_ids = [shift_id for shift_id, _ in assignments]
+        self.assigned = [list(employee_list) for _, employee_list in assignments]
+
+        candidates = dict(available_employees)
+        self.candidates = [list(candidates.get(shift_id, [])) for shift_id in self.shift_ids]
+        self.candidate_sets = [set(employee_list) for employee_list in self.candidates]
+
+        shift_lookup = {}
+        for day_index, day in enumerate(shifts):
+            for shift in day:
+                shift_lookup[shift[0]] = (int(shift[5]), shift_length(shift[2], shift[3]), day_index)
+
+        self.required = [shift_lookup[shift_id][0] for shift_id in self.shift_ids]
+        self.lengths = [shift_lookup[shift_id][1] for shift_id in self.shift_ids]
+        self.days = [shift_lookup[shift_id][2] for shift_id in self.shift_ids]
+
+        known_rates = [emp.rate for emp in employees.values() if emp.rate != float('inf')]
+        unknown_rate = max(known_rates) if known_rates else 0
+        self.rates = {}
+        self.wages = {}
+        self.minimum_hours = {}
+        self.maximum_hours = {}
+        for emp in employees.values():
+            self.rates[emp.id] = emp.rate if emp.rate != float('inf') else unknown_rate
+            self.wages[emp.id] = emp.rate if emp.rate != float('inf') else 0
+            self.minimum_hours[emp.id] = emp.minimum_hours
+            self.maximum_hours[emp.id] = emp.maximum_hours
+
+        self.hours = {employee_id: 0 for employee_id in self.rates}
+        self.day_counts = {employee_id: [0] * 7 for employee_id in self.rates}
+        self.employee_shifts = {employee_id: set() for employee_id in self.rates}
+
+        for index, employee_list in enumerate(self.assigned):
+            for employee_id in employee_list:
+                self.add_to_shift(employee_id, index)
+
+        self.cost = sum(self.employee_cost(employee_id) for employee_id in self.rates) + UNFILLED_PENALTY * sum(self.unfilled(index) for index in range(len(self.shift_ids)))
+
+        self.initial_cost = self.cost
+        self.initial_wage_cost = self.wage_cost(self.assigned)
+        self.best_cost = self.cost
+        self.best_assigned = [list(employee_list) for employee_list in self.assigned]
+        self.iterations = 0
+        self.elapsed = 0
+
+    def employee_cost(self, employee_id):
+        """
+        Returns the wage cost of an employee's current hours and the penalty for being under their minimum hours.
+        """
+
+        hours = self.hours[employee_id]
+        cost = self.rates[employee_id] * hours
+        cost += UNDER_HOURS_PENALTY * max(0, self.minimum_hours[employee_id] - hours)
+
+        return cost
+
+    def wage_cost(self, assigned):
+        """
+        Returns the wages paid for a set of assignments, counting employees without a rate as free like Schedule_Plan does.
+        """
+
+        return sum(self.wages[employee_id] * self.lengths[index] for index, employee_list in enumerate(assigned) for employee_id in employee_list)
+
+    def unfilled(self, index):
+        """
+        Returns the number of places left empty on a shift.
+        """
+
+        return max(0, self.required[index] - len(self.assigned[index]))
+
+    def add_to_shift(self, employee_id, index):
+        """
+        Update the hours and days worked when an employee is put on a shift.
+        """
+
+        self.hours[employee_id] += self.lengths[index]
+        self.day_counts[employee_id][self.days[index]] += 1
+        self.employee_shifts[employee_id].add(index)
+
+    def remove_from_shift(self, employee_id, index):
+        """
+        Update the hours and days worked when an employee is taken off a shift.
+        """
+
+        self.hours[employee_id] -= self.lengths[index]
+        self.day_counts[employee_id][self.days[index]] -= 1
+        self.employee_shifts[employee_id].discard(index)
+
+    def is_feasible(self, change):
+        """
+        Check that a change only uses available employees and puts no one over their maximum hours or on two shifts in a day.
+        An employee the greedy pass already left in breach is only rejected if the change makes it worse.
+        """
+
+        hours = {}
+        day_counts = {}
+        for removed, added, index in change:
+            if added not in self.candidate_sets[index]:
+                return False
+
+            day = self.days[index]
+            if removed is not None:
+                hours[removed] = hours.get(removed, 0) - self.lengths[index]
+                day_counts[(removed, day)] = day_counts.get((removed, day), 0) - 1
+            hours[added] = hours.get(added, 0) + self.lengths[index]
+            day_counts[(added, day)] = day_counts.get((added, day), 0) + 1
+
+        for employee_id, extra_hours in hours.items():
+            if extra_hours > 0 and self.hours[employee_id] + extra_hours > self.maximum_hours[employee_id] + 1e-9:
+                return False
+
+        for (employee_id, day), extra_shifts in day_counts.items():
+            if extra_shifts > 0 and self.day_counts[employee_id][day] + extra_shifts > 1:
+                return False
+
+        return True
+
+    def propose_move(self):
+        """
+        Returns a change that fills a place on a shift or replaces one of its employees.
+        """
+
+        index = self.random.randrange(len(self.shift_ids))
+        options = [emp for emp in self.candidates[index] if emp not in self.assigned[index]]
+        if options == []:
+            return None
+
+        new_employee = self.random.choice(options)
+        if len(self.assigned[index]) < self.required[index]:
+            change = [(None, new_employee, index)]
+        elif self.assigned[index] == []:
+            return None
+        else:
+            change = [(self.random.choice(self.assigned[index]), new_employee, index)]
+
+        return change if self.is_feasible(change) else None
+
+    def propose_swap(self):
+        """
+        Returns a change that exchanges the employees on two shifts.
+        """
+
+        first, second = self.random.randrange(len(self.shift_ids)), self.random.randrange(len(self.shift_ids))
+        if first == second or self.assigned[first] == [] or self.assigned[second] == []:
+            return None
+
+        first_employee = self.random.choice(self.assigned[first])
+        second_employee = self.random.choice(self.assigned[second])
+        if first_employee == second_employee or first_employee in self.assigned[second] or second_employee in self.assigned[first]:
+            return None
+
+        change = [(first_employee, second_employee, first), (second_employee, first_employee, second)]
+
+        return change if self.is_feasible(change) else None
+
+    def propose_exchange(self):
+        """
+        Returns a 2-opt style change that exchanges every shift two employees work over a run of days.
+        """
+
+        index = self.random.randrange(len(self.shift_ids))
+        if self.assigned[index] == [] or self.candidates[index] == []:
+            return None
+
+        first_employee = self.random.choice(self.assigned[index])
+        second_employee = self.random.choice(self.candidates[index])
+        if first_employee == second_employee:
+            return None
+
+        first_day, last_day = sorted((self.days[index], self.random.randrange(7)))
+        change = []
+        for employee_id, other_id in ((first_employee, second_employee), (second_employee, first_employee)):
+            for shift_index in sorted(self.employee_shifts[employee_id]):
+                if first_day <= self.days[shift_index] <= last_day and other_id not in self.assigned[shift_index]:
+                    change.append((employee_id, other_id, shift_index))
+
+        if change == []:
+            return None
+
+        return change if self.is_feasible(change) else None
+
+    def apply_change(self, change):
+        """
+        Applies a change and returns how much it altered the cost by.
+        """
+
+        affected = {employee_id for removed, added, _ in change for employee_id in (removed, added) if employee_id is not None}
+        before = sum(self.employee_cost(employee_id) for employee_id in affected)
+        before += UNFILLED_PENALTY * sum(self.unfilled(index) for _, _, index in change)
+
+        for removed, added, index in change:
+            if removed is not None:
+                self.assigned[index].remove(removed)
+                self.remove_from_shift(removed, index)
+            self.assigned[index].append(added)
+            self.add_to_shift(added, index)
+
+        after = sum(self.employee_cost(employee_id) for employee_id in affected)
+        after += UNFILLED_PENALTY * sum(self.unfilled(index) for _, _, index in change)
+
+        return after - before
+
+    def undo_change(self, change):
+        """
+        Reverses a change made by apply_change.
+        """
+
+        for removed, added, index in reversed(change):
+            self.assigned[index].remove(added)
+            self.remove_from_shift(added, index)
+            if removed is not None:
+                self.assigned[index].append(removed)
+                self.add_to_shift(removed, index)
+
+    def run(self, time_budget=2.0, max_iterations=None, start_temperature=50.0, end_temperature=0.1, cancelled=None, progress=None):
+        """
+        Searches for cheaper or better covered assignments until the time budget runs out or cancelled reports that the run has been stopped.
+        Progress is reported as the percentage of the time budget used.
+        """
+
+        if self.shift_ids == []:
+            return self.result()
+
+        progress = progress or (lambda percent: None)
+        reported = 0
+        start = time.perf_counter()
+        while max_iterations is None or self.iterations < max_iterations:
+            self.elapsed = time.perf_counter() - start
+            if self.elapsed >= time_budget or (cancelled is not None and cancelled()):
+                break
+
+            percent = int(self.elapsed * 100 / time_budget)
+            if percent > reported:
+                reported = percent
+                progress(percent)
+
+            neighbourhood = self.random.random()
+            if neighbourhood < 0.4:
+                change = self.propose_move()
+            elif neighbourhood < 0.8:
+                change = self.propose_swap()
+            else:
+                change = self.propose_exchange()
+            if change is None:
+                continue
+
+            temperature = start_temperature * (end_temperature / start_temperature) ** (self.elapsed / time_budget)
+            delta = self.apply_change(change)
+            self.iterations += 1
+            if delta <= 0 or self.random.random() < math.exp(-delta / temperature):
+                self.cost += delta
+                if self.cost < self.best_cost - 1e-9:
+                    self.best_cost = self.cost
+                    self.best_assigned = [list(employee_list) for employee_list in self.assigned]
+            else:
+                self.undo_change(change)
+
+        self.elapsed = time.perf_counter() - start
+
+        return self.result()
+
+    def result(self):
+        """
+        Returns the best assignments found in the same format as find_optimal_employees.
+        """
+
+        return list(zip(self.shift_ids, self.best_assigned))
+
+    def improvement(self):
+        """
+        Returns how much the search reduced the penalised cost of the greedy assignments by.
+        This can be positive while wages go up, when the extra wages pay for filling empty places.
+        """
+
+        return self.initial_cost - self.best_cost
+
+    def wage_improvement(self):
+        """
+        Returns how much the search reduced the wages of the greedy assignments by.
+        """
+
+        return self.initial_wage_cost - self.wage_cost(self.best_assigned)
+
+    def iterations_per_second(self):
+        """
+        Returns the speed of the search.
+        """
+
+        return self.iterations / self.elapsed if self.elapsed else 0
+
+
+class Schedule_Plan:
+    """
+    Stores a computed schedule and how it differs from the assignments currently saved.
+    """
+
+    def __init__(self, assignments, current_assignments, shifts, employees, improver=None):
+        """
+        Work out the coverage, total cost and difference of a set of assignments.
+        """
+
+        self.assignments = assignments
+        self.improver = improver
+        self.shift_ids = [shift[0] for day in shifts for shift in day]
+
+        planned = {(employee_id, shift_id) for shift_id, employee_list in assignments for employee_id in employee_list}
+        current = {(employee_id, shift_id) for employee_id, shift_id, status in current_assignments}
+
+        self.to_add = planned - current
+        self.to_remove = current - planned
+        self.unchanged = planned & current
+
+        shift_lookup = {shift[0]: shift for day in shifts for shift in day}
+        self.required = sum(int(shift_lookup[shift_id][5]) for shift_id, _ in assignments)
+        self.filled = sum(min(len(employee_list), int(shift_lookup[shift_id][5])) for shift_id, employee_list in assignments)
+        self.coverage = self.filled / self.required if self.required else 1.0
+
+        self.total_cost = 0
+        for shift_id, employee_list in assignments:
+            hours = shift_length(shift_lookup[shift_id][2], shift_lookup[shift_id][3])
+            for employee_id in employee_list:
+                rate = employees[f"employee_id_{employee_id}"].rate
+                if rate != float('inf'):
+                    self.total_cost += rate * hours
+
+    def has_changes(self):
+        """
+        Return whether applying the plan would change the database.
+        """
+
+        return bool(self.to_add or self.to_remove)
+
+
+def shift_length(start_time, end_time):
+    """
+    Returns the length of a shift in hours from its HH.mm start and end times.
+    """
+
+    start_hour, start_min = map(int, str(start_time).split("."))
+    end_hour, end_min = map(int, str(end_time).split("."))
+
+    return ((end_hour * 60 + end_min) - (start_hour * 60 + start_min)) / 60
+
+
 def create_employees(user_id):
     """
     Creates a dictionary of instances of employee class.
     """
 
-    employee_ids = [
-        Database_Controller.find_employee_id(*person.split(" "))[0]
-        for person in Database_Controller.get_employees(user_id)
-    ]
-    return {f"employee_id_{id}": Employee(id) for id in employee_ids}
+    business_id = Database_Controller.find_employee_business(user_id)
 
+    return {
+        f"employee_id_{id}": Employee(id, rate, minimum_hours, maximum_hours)
+        for id, name, position_id, rate, minimum_hours, maximum_hours in Database_Controller.get_roster(business_id)
+    }
 
-def get_shifts_in_week(user_id):
+
+def week_monday(monday=None):
     """
-    Returns a list of the shifts in a given week.
+    Returns the Monday given, or the Monday of the current week.
     """
 
-    business_id = Database_Controller.find_employee(user_id)[1]
-    monday_this_week = date.today() - timedelta(days=date.today().isoweekday() - 1)
-    week_dates = [(monday_this_week + timedelta(days=i)).strftime('%d-%m-%Y') for i in range(7)]
+    return monday or date.today() - timedelta(days=date.today().isoweekday() - 1)
+
+
+def get_shifts_in_week(user_id, monday=None):
+    """
+    Returns a list of the shifts in the week starting on the given Monday, or the current week.
+    """
+
+    business_id = Database_Controller.find_employee_business(user_id)
+    week_dates = [(week_monday(monday) + timedelta(days=i)).strftime('%d-%m-%Y') for i in range(7)]
     
     return [
         Database_Controller.get_shifts(business_id, day) + Database_Controller.get_shifts(business_id, week_date)
@@ -77,11 +439,9 @@ def clear_shifts(user_id, shifts):
     Removes all shifts in the week from the database.
     """
 
-    employee_ids = [
-        Database_Controller.find_employee_id(*person.split(" "))[0]
-        for person in Database_Controller.get_employees(user_id)
-    ]
-    
+    business_id = Database_Controller.find_employee_business(user_id)
+    employee_ids = [row[0] for row in Database_Controller.get_roster(business_id)]
+
     for day in shifts:
         for shift_id, *_ in day:
             for emp_id in employee_ids:
@@ -91,20 +451,30 @@ def clear_shifts(user_id, shifts):
                     pass  
 
 
-def find_available_employees(shifts):
+def find_available_employees(shifts, check_assigned=True, cancelled=None, progress=None, monday=None):
     """
-    Finds the employees who are available to work each shift in the week.
+    Finds the employees who are available to work each shift in the week starting on the given Monday, or the current week.
+    Existing assignments are ignored when check_assigned is False, as they are when the week is being replaced.
+    Progress is reported as a percentage of the shifts checked and None is returned if cancelled reports that the run has been stopped.
     """
 
+    progress = progress or (lambda percent: None)
+    total_shifts = sum(len(day) for day in shifts)
     available = []
     
-    for day in shifts:
+    for day_index, day in enumerate(shifts):
         used_employees = []
         for shift in day:
+            if cancelled is not None and cancelled():
+                return None
+            progress(len(available) * 100 // total_shifts)
+
             shift_id, business_id, start_time, end_time, cal_date, _, position_required = shift[:7]
+            if cal_date in DAYS_OF_WEEK:
+                cal_date = (week_monday(monday) + timedelta(days=day_index)).strftime('%d-%m-%Y')
             available_employees = [
                 emp for emp in Database_Controller.get_available_employees(business_id, position_required, cal_date, start_time, end_time)
-                if Database_Controller.find_if_employee_available(emp, shift_id)
+                if not check_assigned or Database_Controller.find_if_employee_available(emp, shift_id)
             ]
             used_employees.append(emp for emp in available_employees)
             available.append((shift_id, available_employees))
@@ -112,24 +482,30 @@ def find_available_employees(shifts):
     return available
 
 
-def find_optimal_employees(available_employees, employees):
+def find_optimal_employees(available_employees, employees, shifts, cancelled=None, progress=None):
     """
-    Ranks the employees to create an optimal assignment of workers.
+    Ranks the employees to create an optimal assignment of workers, reading shift details from the week's shifts.
+    Progress is reported as a percentage of the shifts filled and None is returned if cancelled reports that the run has been stopped.
     """
 
+    progress = progress or (lambda percent: None)
+    shift_lookup = {shift[0]: shift for day in shifts for shift in day}
     employees_working = []
 
     for shift_id, employee_ids in available_employees:
-        shift_info = Database_Controller.get_shift_info(shift_id)
-        num_required = int(shift_info[-2])
+        if cancelled is not None and cancelled():
+            return None
+        progress(len(employees_working) * 100 // len(available_employees))
+
+        shift_info = shift_lookup[shift_id]
+        start_time, end_time, shift_date, num_required = shift_info[2], shift_info[3], shift_info[4], int(shift_info[5])
         employees_working_shift = []
-        shift_date = shift_info[4]
 
         for employee in employee_ids:
             emp_obj = employees[f"employee_id_{employee}"]
             if emp_obj.current_hours < emp_obj.maximum_hours and emp_obj.current_hours <= emp_obj.minimum_hours and emp_obj.is_available_for_day(shift_date):
                 employees_working_shift.append(employee)
-                emp_obj.increase_hours(shift_id)
+                emp_obj.increase_hours(start_time, end_time)
                 emp_obj.mark_scheduled_for_day(shift_date)
                 if len(employees_working_shift) >= num_required:
                     break
@@ -144,7 +520,7 @@ def find_optimal_employees(available_employees, employees):
 
             for emp, _ in eligible_employees:
                 employees_working_shift.append(emp)
-                employees[f"employee_id_{emp}"].increase_hours(shift_id)
+                employees[f"employee_id_{emp}"].increase_hours(start_time, end_time)
                 employees[f"employee_id_{emp}"].mark_scheduled_for_day(shift_date)
                 if len(employees_working_shift) >= num_required:
                     break
@@ -164,23 +540,79 @@ def assign_shifts(assignments):
             Database_Controller.assign_shift(employee, shift_id, 1)
 
 
-def create_new_schedule(user_id):
+def improve_assignments(assignments, available_employees, employees, shifts, time_budget=2.0, seed=None, cancelled=None, progress=None):
     """
-    Generates a new, optimal, schedule.
+    Runs a local search over the greedy assignments and returns the improver used.
     """
 
+    improver = Schedule_Improver(assignments, available_employees, employees, shifts, seed)
+    improver.run(time_budget, cancelled=cancelled, progress=progress)
+
+    return improver
+
+
+def plan_new_schedule(user_id, improve=False, time_budget=2.0, progress=None, cancelled=None, monday=None):
+    """
+    Generates a new, optimal, schedule for the week starting on the given Monday, or the current week, without changing the database.
+    Progress is reported as a percentage and None is returned if the run is cancelled.
+    """
+
+    progress = progress or (lambda percent: None)
+    cancelled = cancelled or (lambda: False)
+
     employees = create_employees(user_id)
-    shifts = get_shifts_in_week(user_id)
-    clear_shifts(user_id, shifts)
-    available_employees = find_available_employees(shifts)
-    optimal_employees = find_optimal_employees(available_employees, employees)
-    assign_shifts(optimal_employees)
+    shifts = get_shifts_in_week(user_id, monday)
+    progress(10)
+
+    available_employees = find_available_employees(shifts, check_assigned=False, cancelled=cancelled, progress=lambda percent: progress(10 + percent // 2), monday=monday)
+    if available_employees is None:
+        return None
+    progress(60)
+
+    optimal_employees = find_optimal_employees(available_employees, employees, shifts, cancelled, progress=lambda percent: progress(60 + percent * 15 // 100))
+    if optimal_employees is None:
+        return None
+    improver = None
+    progress(75)
+
+    if improve and not cancelled():
+        improver = improve_assignments(optimal_employees, available_employees, employees, shifts, time_budget, cancelled=cancelled, progress=lambda percent: progress(75 + percent * 15 // 100))
+        optimal_employees = improver.result()
+
+    if cancelled():
+        return None
+    progress(90)
+
+    current_assignments = Database_Controller.get_shift_assignments(shift[0] for day in shifts for shift in day)
+    progress(100)
+
+    return Schedule_Plan(optimal_employees, current_assignments, shifts, employees, improver)
+
+
+def apply_schedule(plan):
+    """
+    Writes only the differences between a plan and the saved schedule to the database.
+    """
+
+    if plan.has_changes():
+        Database_Controller.apply_shift_changes(plan.to_remove, plan.to_add, 1)
+
+
+def create_new_schedule(user_id, improve=False, time_budget=2.0):
+    """
+    Generates a new, optimal, schedule.
+    """
+
+    plan = plan_new_schedule(user_id, improve, time_budget)
+    apply_schedule(plan)
+
+    return plan
 
 
-def clear_schedule(user_id):
+def clear_schedule(user_id, monday=None):
     """
-    Clears the current schedule from the database.
+    Clears the schedule for the week starting on the given Monday, or the current week, from the database.
     """
     
-    shifts = get_shifts_in_week(user_id)
+    shifts = get_shifts_in_week(user_id, monday)
     clear_shifts(user_id, shifts)
@@ -0,0 +1,62 @@
+import hmac, secrets, time
+from collections import namedtuple
+
+EMPLOYEE = 1
+MANAGER = 2
+
+SESSION_LIFETIME = 8 * 60 * 60
+ELEVATION_LIFETIME = 15 * 60
+
+Session = namedtuple("Session", ["token", "level", "expires", "elevated_until"])
+
+sessions = {}
+
+
+def start_session(employee_id, level=EMPLOYEE):
+    """
+    Start a session for an employee whose password has just been checked and return its random token.
+    The session starts elevated, as the password was only just entered.
+    """
+
+    now = time.monotonic()
+    token = secrets.token_hex(32)
+    sessions[employee_id] = Session(token, level, now + SESSION_LIFETIME, now + ELEVATION_LIFETIME)
+
+    return token
+
+
+def check_session(employee_id, token, level=EMPLOYEE, elevated=False):
+    """
+    Check a session token in constant time, along with its expiry, its level and, if asked, whether it is still elevated.
+    """
+
+    session = sessions.get(employee_id)
+    if session is None or token is None:
+        return False
+
+    now = time.monotonic()
+    if not hmac.compare_digest(session.token, token) or now >= session.expires or session.level < level:
+        return False
+
+    return not elevated or now < session.elevated_until
+
+
+def elevate_session(employee_id, token):
+    """
+    Allow sensitive actions again for a while after the employee has re-entered their password.
+    """
+
+    if not check_session(employee_id, token):
+        return False
+
+    sessions[employee_id] = sessions[employee_id]._replace(elevated_until=time.monotonic() + ELEVATION_LIFETIME)
+
+    return True
+
+
+def end_session(employee_id):
+    """
+    Forget an employee's session when they log out.
+    """
+
+    sessions.pop(employee_id, None)
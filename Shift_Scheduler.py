@@ -1,10 +1,24 @@
-from PySide6.QtCore import Qt, QTime, QDate
-from PySide6.QtWidgets import (QPushButton, QApplication, QLabel, QVBoxLayout, QHBoxLayout, QWidget, QMainWindow, QSpacerItem, QSizePolicy, QLineEdit, QStackedWidget, QMessageBox, QFileDialog, QComboBox, QTextEdit, QFrame, QTableWidget, QHeaderView, QScrollArea, QDateEdit, QTimeEdit, QStyledItemDelegate, QAbstractItemView, QTableWidgetItem)
-from PySide6.QtGui import QFont, QPixmap, QImage, QPainter, QPainterPath, QIcon, QTextOption, QColor
+import sys, Startup_Profiler
+
+PROFILE_STARTUP = "--profile-startup" in sys.argv
+if PROFILE_STARTUP:
+    Startup_Profiler.enable()
+
+from PySide6.QtCore import Qt, QTime, QDate, QObject, QRunnable, QThreadPool, QTimer, Signal, QAbstractTableModel, QModelIndex, QBuffer, QByteArray, QIODevice
+from PySide6.QtWidgets import (QPushButton, QApplication, QLabel, QVBoxLayout, QHBoxLayout, QWidget, QMainWindow, QSpacerItem, QSizePolicy, QLineEdit, QStackedWidget, QMessageBox, QFileDialog, QComboBox, QTextEdit, QFrame, QTableView, QHeaderView, QScrollArea, QDateEdit, QTimeEdit, QStyledItemDelegate, QAbstractItemView, QProgressDialog, QInputDialog)
+from PySide6.QtGui import QFont, QPixmap, QImage, QPainter, QPainterPath, QTextOption, QColor
 from datetime import date, timedelta
-import sys, Database_Controller, Schedule_employees, Password_Hasher, re
+from collections import OrderedDict
+import threading, sqlite3, csv, Database_Controller, Change_Bus, Session_Manager, re
 
 DAYS_OF_WEEK = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+STATUS_ROLE = Qt.UserRole + 1
+PAYLOAD_ROLE = Qt.UserRole + 2
+TIME_OFF_STYLES = {1: ("Pending", "#333333", "white"), 2: ("Approved", "#1E831F", "black"), 3: ("Rejected", "#831E1E", "white")}
+THUMBNAIL_CACHE_SIZE = 64
+WEEK_CACHE_SIZE = 12
+OPTIMISE_TIME_BUDGET = 2.0
+PROFILE_FIELDS = ("business_id", "first_name", "last_name", "email", "phone_number", "position_id", "hourly_rate", "minimum_hours", "maximum_hours")
 MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', 'November', 'December']
 
 class Popup(QMainWindow):
@@ -57,14 +71,221 @@ class No_details(Popup):
         self.popup.exec()
 
 
+class Schedule_Failed(Popup):
+    """
+    Popup to indicate that a schedule could not be generated
+    """
+
+    def __init__(self, error):
+        super().__init__()
+        self.popup.setIcon(QMessageBox.Icon.Warning)
+        self.popup.setWindowTitle('Schedule Not Generated')
+        self.popup.setText(f'The schedule could not be generated, so the current one has been kept.\n\n{error}')
+        self.popup.exec()
+
+
+class Confirm_Schedule(Popup):
+    """
+    Popup showing the coverage, cost and changes of a generated schedule before it is saved
+    """
+
+    def __init__(self, plan):
+        super().__init__()
+        self.popup.setIcon(QMessageBox.Icon.Question)
+        self.popup.setWindowTitle('Apply Schedule')
+        optimised = ''
+        if plan.improver is not None:
+            optimised = f'\nOptimising lowered the cost and unfilled place penalty by {plan.improver.improvement():.2f}, trying {plan.improver.iterations_per_second():.0f} changes per second.'
+        self.popup.setText(f'Coverage: {plan.coverage:.0%}\nTotal cost: {plan.total_cost:.2f}{optimised}\n\n{len(plan.to_add)} assignments will be added and {len(plan.to_remove)} removed.\n\nSave this schedule?')
+        self.popup.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        self.popup.exec()
+        self.accepted = self.popup.clickedButton() == self.popup.button(QMessageBox.StandardButton.Yes)
+
+
+class Confirm_Reset_Passwords(Popup):
+    """
+    Popup asking a manager to confirm resetting the password of every other employee
+    """
+
+    def __init__(self, count):
+        super().__init__()
+        self.popup.setIcon(QMessageBox.Icon.Warning)
+        self.popup.setWindowTitle('Reset Passwords')
+        self.popup.setText(f'The passwords of {count} employees will be reset to the standard password.\n\nContinue?')
+        self.popup.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        self.popup.exec()
+        self.accepted = self.popup.clickedButton() == self.popup.button(QMessageBox.StandardButton.Yes)
+
+
+class Bulk_Update_Finished(Popup):
+    """
+    Popup reporting how many employees a bulk import or reset changed and how quickly
+    """
+
+    def __init__(self, action, result):
+        super().__init__()
+        count, per_second = result
+        self.popup.setIcon(QMessageBox.Icon.Information)
+        self.popup.setWindowTitle('Employees Updated')
+        self.popup.setText(f'{count} employees {action} ({per_second:.1f} per second).')
+        self.popup.exec()
+
+
+class Schedule_Published(Popup):
+    """
+    Popup reporting how many shift assignments were published, or that there were none waiting
+    """
+
+    def __init__(self, count):
+        super().__init__()
+        self.popup.setIcon(QMessageBox.Icon.Information)
+        self.popup.setWindowTitle('Schedule Published')
+        if count:
+            self.popup.setText(f'{count} shift assignments were published.')
+        else:
+            self.popup.setText('There were no pending shifts to publish this week.')
+        self.popup.exec()
+
+
+class Worker_Signals(QObject):
+    """
+    Signals sent from a background worker back to the page that started it
+    """
+
+    finished = Signal(object)
+    failed = Signal(str)
+    progress = Signal(int)
+
+
+class Worker(QRunnable):
+    """
+    Runs a function on the thread pool so the window does not freeze
+    """
+
+    def __init__(self, fn, *args, report_progress=False, **kwargs):
+        """
+        Store the function to run and the arguments to run it with
+        """
+
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = Worker_Signals()
+
+        if report_progress:
+            self.kwargs["progress"] = self.signals.progress.emit
+
+
+    def run(self):
+        """
+        Run the function and send its result back through the signals
+        """
+
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as error:
+            self.signals.failed.emit(str(error))
+        else:
+            self.signals.finished.emit(result)
+
+
+class LRU_Cache():
+    """
+    Keeps the most recently used values, such as decoded pixmaps or loaded weeks, so they are not loaded again
+    """
+
+    def __init__(self, size):
+        """
+        Setup an empty cache that holds up to size values
+        """
+
+        self.size = size
+        self.values = OrderedDict()
+
+
+    def __contains__(self, key):
+        """
+        Check whether a value is cached without marking it as used
+        """
+
+        return key in self.values
+
+
+    def get(self, key):
+        """
+        Return a cached value and mark it as recently used, or None if it is not cached
+        """
+
+        if key not in self.values:
+            return None
+
+        self.values.move_to_end(key)
+
+        return self.values[key]
+
+
+    def put(self, key, value):
+        """
+        Cache a value, dropping the least recently used one if the cache is full
+        """
+
+        self.values[key] = value
+        self.values.move_to_end(key)
+
+        if len(self.values) > self.size:
+            self.values.popitem(last=False)
+
+
+    def discard(self, key):
+        """
+        Remove a value from the cache after it has changed
+        """
+
+        self.values.pop(key, None)
+
+
 class Stack(QMainWindow):
     """
     A system to store all the pages of the program
     """
 
-    def __init__(self):
-        """
-        Setup and add all pages to the system
+    TITLES = {
+        "Start": "Employee Shift Scheduler",
+        "Login": "Login",
+        "Create Business": "Create a Business",
+        "Create Managing Account": "Create a Managing Account",
+        "Edit Employee Details": "Edit Employee Details",
+        "Create Employee": "Add Employee Profile",
+        "Create Position": "Create Business Position",
+        "Managers Main Page": "Employee Shift Scheduler",
+        "Employees Main Page": "Employee Shift Scheduler",
+        "Create One Time Shift": "Create a Shift",
+        "Create Recurring Shift": "Create a Shift",
+        "Manage Shifts": "Manage Shifts",
+        "Empty Shift Details": "Shift Details",
+        "Assigned Shift Details": "Shift Details",
+        "Assign Shift To Employee": "Assign Employee to Shift",
+        "Request Time Off": "Request Time Off",
+        "Manage Employees": "Manage Employees",
+        "Timeoff Request Details": "Time-Off Request",
+        "Initialise Employee Details": "Edit Employee Details"
+    }
+
+    PREWARM_PAGES = {
+        "Start Page": ["Login"],
+        "Login": ["Manager Login", "Employees Main Page"],
+        "Manager Login": ["Managers Main Page"],
+        "Managers Main Page": ["Manage Shifts", "Manage Employees"],
+        "Manage Shifts": ["Empty Shift Details"],
+        "Manage Employees": ["Timeoff Request Details"]
+    }
+
+    data_changed = Signal(object)
+
+    def __init__(self, prewarm=True):
+        """
+        Setup the system and register the pages, which are only built when first needed
         """
 
         super().__init__()
@@ -77,41 +298,88 @@ class Stack(QMainWindow):
         self.view.addWidget(self.stack)
 
         self.current_user = None
+        self.session_token = None
         self.editing_user = None
         self.current_shift = None
         self.current_request = None
 
         self.history = []
-
-        self.pages = {
-            "Start Page": Start_Page(self),
-            "Login": Employee_Login_Page(self),
-            "Create Business": Create_Business(self),
-            "Create Managing Account": Create_Managing_Account(self),
-            "Edit Employee Details": Edit_Employee_Details(self),
-            "Create Employee": Create_Employee(self),
-            "Create Position": Create_Position(self),
-            "Managers Main Page": Manager_MainPage(self),
-            "Employees Main Page": Employee_MainPage(self),
-            "Create One Time Shift": Create_OneTime_Shift(self),
-            "Create Recurring Shift": Create_Recurring_Shift(self),
-            "Manage Shifts": Manage_Shifts(self),
-            "Empty Shift Details": View_Empty_Shift_Details(self),
-            "Assigned Shift Details": View_Assigned_Shift_Details(self),
-            "Assign Shift To Employee": Assign_Shift(self),
-            "Request Time Off": Request_Time_Off(self),
-            "Manage Employees": Manage_Employees(self),
-            "Timeoff Request Details": View_Timeoff_Request_Details(self),
-            "Initialise Employee Details": Initialise_Employee_Details(self),
-            "Manager Login": Manager_Login_Page(self),
-            "Reset Password": Reset_Password(self)
+        self.prewarm = prewarm
+
+        self.page_factories = {
+            "Start Page": Start_Page,
+            "Login": Employee_Login_Page,
+            "Create Business": Create_Business,
+            "Create Managing Account": Create_Managing_Account,
+            "Edit Employee Details": Edit_Employee_Details,
+            "Create Employee": Create_Employee,
+            "Create Position": Create_Position,
+            "Managers Main Page": Manager_MainPage,
+            "Employees Main Page": Employee_MainPage,
+            "Create One Time Shift": Create_OneTime_Shift,
+            "Create Recurring Shift": Create_Recurring_Shift,
+            "Manage Shifts": Manage_Shifts,
+            "Empty Shift Details": View_Empty_Shift_Details,
+            "Assigned Shift Details": View_Assigned_Shift_Details,
+            "Assign Shift To Employee": Assign_Shift,
+            "Request Time Off": Request_Time_Off,
+            "Manage Employees": Manage_Employees,
+            "Timeoff Request Details": View_Timeoff_Request_Details,
+            "Initialise Employee Details": Initialise_Employee_Details,
+            "Manager Login": Manager_Login_Page,
+            "Reset Password": Reset_Password
         }
+        self.pages = {}
 
-        for page in self.pages.values():
-            self.stack.addWidget(page)
+        Change_Bus.subscribe(self.send_data_changed)
 
         self.setWindowTitle("Employee Shift Scheduler")
-        self.stack.setCurrentWidget(self.pages["Start Page"])
+        self.stack.setCurrentWidget(self.get_page("Start Page"))
+        self.schedule_prewarm("Start Page")
+
+
+    def send_data_changed(self, event):
+        """
+        Pass a change event from the database on to the pages, which may be on another thread
+        """
+
+        self.data_changed.emit(event)
+
+
+    def get_page(self, page_key):
+        """
+        Return a page, building it and adding it to the system the first time it is asked for
+        """
+
+        if page_key not in self.pages:
+            with Startup_Profiler.timed("page construction", page_key):
+                page = self.page_factories[page_key](self)
+            self.pages[page_key] = page
+            self.stack.addWidget(page)
+            self.data_changed.connect(page.data_changed)
+
+        return self.pages[page_key]
+
+
+    def schedule_prewarm(self, page_key):
+        """
+        Build the pages likely to be opened next once the window is idle
+        """
+
+        if self.prewarm and any(key not in self.pages for key in self.PREWARM_PAGES.get(page_key, [])):
+            QTimer.singleShot(0, lambda: self.prewarm_pages(page_key))
+
+
+    def prewarm_pages(self, page_key):
+        """
+        Build the next page that is likely to be opened after the given page
+        """
+
+        for next_key in self.PREWARM_PAGES.get(page_key, []):
+            if next_key not in self.pages:
+                self.get_page(next_key)
+                self.schedule_prewarm(page_key)
+                return
 
 
     def load_page(self, page_key):
@@ -119,38 +387,19 @@ class Stack(QMainWindow):
         Load a page from the system when called
         """
 
-        page = self.pages[page_key]
+        page = self.get_page(page_key)
 
         if self.stack.currentWidget() is not page:
             self.history.append(self.stack.currentWidget())
         self.stack.setCurrentWidget(page)
 
-        self.titles = {
-            "Start": "Employee Shift Scheduler",
-            "Login": "Login",
-            "Create Business": "Create a Business",
-            "Create Managing Account": "Create a Managing Account",
-            "Edit Employee Details": "Edit Employee Details",
-            "Create Employee": "Add Employee Profile",
-            "Create Position": "Create Business Position",
-            "Managers Main Page": "Employee Shift Scheduler",
-            "Employees Main Page": "Employee Shift Scheduler",
-            "Create One Time Shift": "Create a Shift",
-            "Create Recurring Shift": "Create a Shift",
-            "Manage Shifts": "Manage Shifts",
-            "Empty Shift Details": "Shift Details",
-            "Assigned Shift Details": "Shift Details",
-            "Assign Shift To Employee": "Assign Employee to Shift",
-            "Request Time Off": "Request Time Off",
-            "Manage Employees": "Manage Employees",
-            "Timeoff Request Details": "Time-Off Request",
-            "Initialise Employee Details": "Edit Employee Details"
-        }
-
-        self.setWindowTitle(self.titles.get(page_key, "Employee Shift Scheduler"))
+        self.setWindowTitle(self.TITLES.get(page_key, "Employee Shift Scheduler"))
 
         if hasattr(page, 'refresh'):
-            page.refresh()
+            with Startup_Profiler.timed("page refresh", page_key):
+                page.refresh_if_changed()
+
+        self.schedule_prewarm(page_key)
 
 
     def go_back(self):
@@ -164,7 +413,7 @@ class Stack(QMainWindow):
 
         page_key = [key for key, value in self.pages.items() if value == previous_page][0]
 
-        self.setWindowTitle(self.titles.get(page_key, "Employee Shift Scheduler"))
+        self.setWindowTitle(self.TITLES.get(page_key, "Employee Shift Scheduler"))
 
 
 class Page(QMainWindow):
@@ -182,10 +431,17 @@ class Page(QMainWindow):
     BUTTON_STYLE = """QPushButton {padding: 15px; border-radius: 20px; background-color: #5b5b5b; color: white;} QPushButton:hover {background-color: #757575;} QPushButton:pressed {background-color: #333333;}"""
     CHOOSE_PHOTO_STYLE = """QPushButton {padding: 10px; border-radius: 20px; background-color: #5b5b5b; color: white;} QPushButton:hover {background-color: #757575;} QPushButton:pressed {background-color: #333333;}"""
     DROPDOWN_STYLE = """QComboBox {padding: 10px; border-radius: 20px; background-color: #5b5b5b; color: white;}"""
-    TIMETABLE_GRID_STYLE = """QHeaderView::section {background-color: #5b5b5b; color: White; border: 2px solid #333333; padding: 5px; border-radius: 5px; text-align: center;} QTableWidget { margin-top: 100px; margin-left: 30px; border-radius: 10px;} QTableWidget::item {border: 2px solid #2d2d2d;}   """
+    TIMETABLE_GRID_STYLE = """QHeaderView::section {background-color: #5b5b5b; color: White; border: 2px solid #333333; padding: 5px; border-radius: 5px; text-align: center;} QTableView { margin-top: 100px; margin-left: 30px; border-radius: 10px;} QTableView::item {border: 2px solid #2d2d2d;}   """
     WRAPAROUND_STYLE = """QTextEdit {padding: 15px; border-radius: 20px; background-color: #5b5b5b; color: white;}"""
     CALENDAR_DROPDOWN_STYLE = """QDateEdit { border: 1px solid #333333; background-color: #5b5b5b; color: white; padding: 15px; border-radius: 20px; width: 250px; font: Cascadia Mono;} QCalendarWidget QAbstractItemView::item {background-color: #5b5b5b; border: 1px solid #333333;} QCalendarWidget QAbstractItemView::item:selected {background-color: #333333;} QCalendarWidget QAbstractItemView::item:highlighted {background-color: #5b5b5b;} QCalendarWidget QHeaderView::section {background-color: #5b5b5b; color: white; padding: 4px;}"""
     TIME_SELECTOR_STYLE = """QTimeEdit {padding: 15px; border-radius: 20px; background-color: #5b5b5b; color: white; width: 100;}"""
+    GRID_ROW_HEIGHT = 100
+    THUMBNAIL_SIZE = 140
+    REFRESH_DELAY = 50
+    REFRESH_ON_DATA_CHANGE = False
+    BUSY_DELAY = 200
+    thumbnail_cache = LRU_Cache(THUMBNAIL_CACHE_SIZE)
+    week_cache = LRU_Cache(WEEK_CACHE_SIZE)
     
 
     def __init__(self):
@@ -202,6 +458,17 @@ class Page(QMainWindow):
         self.back_button = self.create_button("Back", self.BACK_BUTTON_WIDTH, self.BUTTON_FONT, self.go_back)
         self.view.addWidget(self.back_button)
 
+        self.refreshed_key = None
+        self.week_offset = 0
+        self.prefetching = {}
+        self.employee_rows = {}
+        self.day_columns = {}
+        self.assignment_cells = {}
+        self.busy_worker = None
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.timeout.connect(self.refresh_if_changed)
+
 
     def create_button(self, text, width, font, callback, padding_value = None, height = 55 ):
         """
@@ -255,6 +522,341 @@ class Page(QMainWindow):
         return container
     
 
+    def create_grid(self, delegate, column_resize_mode=QHeaderView.Stretch, column_width=None):
+        """
+        Setup a table view and the model that holds its cells
+        """
+
+        model = Week_Grid_Model(self)
+        table = QTableView(self)
+        table.setModel(model)
+        table.setItemDelegate(delegate)
+        table.setStyleSheet(self.TIMETABLE_GRID_STYLE)
+        table.setSelectionMode(QAbstractItemView.SingleSelection)
+        table.setSelectionBehavior(QAbstractItemView.SelectItems)
+
+        header_font = QFont("Cascadia Mono", 12, QFont.Bold)
+        table.verticalHeader().setFont(header_font)
+        table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        table.verticalHeader().setDefaultSectionSize(self.GRID_ROW_HEIGHT)
+        table.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        table.setWordWrap(False)
+        table.horizontalHeader().setFont(header_font)
+        table.horizontalHeader().setSectionResizeMode(column_resize_mode)
+
+        if column_width:
+            table.horizontalHeader().setDefaultSectionSize(column_width)
+
+        scroll_area = QScrollArea(self)
+        scroll_area.setWidget(table)
+        scroll_area.setWidgetResizable(True)
+        scroll_area.setMinimumSize(1500, 750)
+
+        return model, table, scroll_area
+
+
+    def make_circle(self, pixmap, size=THUMBNAIL_SIZE):
+        """
+        Make the photo inputted by the user into a circle
+        """
+
+        image = pixmap.toImage().scaled(size, size, Qt.AspectRatioMode.KeepAspectRatioByExpanding,
+                                        Qt.TransformationMode.SmoothTransformation)
+
+        circular_image = QImage(size, size, QImage.Format.Format_ARGB32)
+        circular_image.fill(Qt.GlobalColor.transparent)
+
+        painter = QPainter(circular_image)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        path = QPainterPath()
+        path.addEllipse(0, 0, size, size)
+        painter.setClipPath(path)
+
+        painter.drawPixmap(0, 0, QPixmap.fromImage(image))
+        painter.end()
+
+        return QPixmap.fromImage(circular_image)
+
+
+    def pixmap_to_png(self, pixmap):
+        """
+        Encode a pixmap as PNG bytes so it can be stored in the database
+        """
+
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.WriteOnly)
+        pixmap.save(buffer, "PNG")
+        buffer.close()
+
+        return data.data()
+
+
+    def load_thumbnail(self, employee_id):
+        """
+        Return the circular thumbnail of an employee's photo, or None if they have not got one.
+        Thumbnails are served from the cache, then the database, and are only built from the full photo once if missing.
+        """
+
+        pixmap = self.thumbnail_cache.get(employee_id)
+        if pixmap is not None:
+            return pixmap
+
+        thumbnail = Database_Controller.find_employee_thumbnail(employee_id)
+        pixmap = QPixmap()
+
+        if not (thumbnail and pixmap.loadFromData(thumbnail)):
+            photo = Database_Controller.find_employee_photo(employee_id)
+            if not (photo and pixmap.loadFromData(photo)):
+                return None
+
+            pixmap = self.make_circle(pixmap)
+            Database_Controller.save_employee_thumbnail(employee_id, self.pixmap_to_png(pixmap))
+
+        self.thumbnail_cache.put(employee_id, pixmap)
+
+        return pixmap
+
+
+    def week_start(self, week_offset=None):
+        """
+        Return the Monday of the week being viewed, or of the week a number of weeks from the current one
+        """
+
+        if week_offset is None:
+            week_offset = self.week_offset
+
+        return date.today() - timedelta(days=date.today().weekday()) + timedelta(weeks=week_offset)
+
+
+    def week_dates(self, monday):
+        """
+        Return the dates of a week in the format shifts are stored in
+        """
+
+        return [(monday + timedelta(days=i)).strftime("%d-%m-20%y") for i in range(7)]
+
+
+    def week_labels(self, monday):
+        """
+        Return the column titles for a week, showing each day with its date
+        """
+
+        return [f"{day} {(monday + timedelta(days=i)).strftime('%d/%m')}" for i, day in enumerate(DAYS_OF_WEEK)]
+
+
+    def create_week_buttons(self):
+        """
+        Create the buttons that move the grid back or forward a week
+        """
+
+        previous_week_button = self.create_button("<", 50, QFont('Cascadia Mono', 12), lambda: self.change_week(-1), height = 50)
+        next_week_button = self.create_button(">", 50, QFont('Cascadia Mono', 12), lambda: self.change_week(1), height = 50)
+
+        return [previous_week_button, next_week_button]
+
+
+    def change_week(self, weeks):
+        """
+        Move the grid back or forward by a number of weeks
+        """
+
+        self.week_offset += weeks
+        self.refresh_if_changed()
+
+
+    def load_week(self, kind, loader, owner_id, monday):
+        """
+        Return the data for a week of a business or employee, from the cache if it was already loaded since the database last changed
+        """
+
+        key = (kind, owner_id, monday, Database_Controller.get_data_version())
+
+        data = self.week_cache.get(key)
+        if data is None:
+            data = loader(owner_id, monday)
+            self.week_cache.put(key, data)
+
+        return data
+
+
+    def prefetch_weeks(self, kind, loader, owner_id):
+        """
+        Load the weeks either side of the one being viewed on the thread pool so moving to them is instant
+        """
+
+        for week_offset in (self.week_offset - 1, self.week_offset + 1):
+            monday = self.week_start(week_offset)
+            key = (kind, owner_id, monday, Database_Controller.get_data_version())
+            if key in self.week_cache or key in self.prefetching:
+                continue
+
+            worker = Worker(loader, owner_id, monday)
+            worker.signals.finished.connect(lambda data, key=key: self.week_prefetched(key, data))
+            worker.signals.failed.connect(lambda error, key=key: self.prefetching.pop(key, None))
+            self.prefetching[key] = worker
+            QThreadPool.globalInstance().start(worker)
+
+
+    def week_prefetched(self, key, data):
+        """
+        Store a week loaded in the background
+        """
+
+        self.prefetching.pop(key, None)
+        self.week_cache.put(key, data)
+
+
+    def load_schedule_week(self, business_id, monday):
+        """
+        Load the roster and every assignment needed to show a week of the schedule
+        """
+
+        roster = Database_Controller.get_roster(business_id)
+        assignments = Database_Controller.get_assigned_shift_details(business_id, self.week_dates(monday) + DAYS_OF_WEEK)
+
+        return roster, assignments
+
+
+    def fill_schedule_grid(self, model, group_by_position=False):
+        """
+        Fill a week grid with every employee's assigned shifts in one pass over the assignments.
+        Each row belongs to an employee in the roster and each column to a day of the current week.
+        When grouped, employees are listed under a heading row for each position.
+        """
+
+        if self.parent_stack.current_user == None:
+            return
+
+        business_id = Database_Controller.find_employee_business(self.parent_stack.current_user)
+        monday = self.week_start()
+        roster, assignments = self.load_week("schedule", self.load_schedule_week, business_id, monday)
+        cells = {}
+
+        if group_by_position:
+            position_names = Database_Controller.get_position_names(business_id)
+            roster = sorted(roster, key=lambda employee: (str(position_names.get(employee[2], "")), str(employee[1])))
+
+            grouped_roster = []
+            for employee in roster:
+                position = position_names.get(employee[2], "No Position")
+                if not grouped_roster or grouped_roster[-1][2] != employee[2]:
+                    for column in range(7):
+                        cells[(len(grouped_roster), column)] = {"text": "", "colour": "#5b5b5b"}
+                    grouped_roster.append((None, position, employee[2]))
+                grouped_roster.append(employee)
+            roster = grouped_roster
+
+        people_names = [str(employee[1]) for employee in roster]
+        rows = {employee[0]: row for row, employee in enumerate(roster) if employee[0] is not None}
+
+        columns = {day: column for days in (self.week_dates(monday), DAYS_OF_WEEK) for column, day in enumerate(days)}
+
+        self.shift_grid = [[employee[0], [()]*7] for employee in roster]
+        self.shifts = []
+        self.employee_rows = rows
+        self.day_columns = columns
+        self.assignment_cells = {}
+
+        for employee_id, shift_id, shift_date, start_time, end_time, status in assignments:
+            row = rows.get(employee_id)
+            if row is None:
+                continue
+
+            column = columns[shift_date]
+            self.shift_grid[row][1][column] = shift_id
+            self.shifts.append([employee_id, shift_id, column])
+            self.assignment_cells[(employee_id, shift_id)] = (row, column, (start_time, end_time))
+            cells[(row, column)] = self.shift_cell((employee_id, shift_id), (start_time, end_time), status)
+
+        model.set_week(people_names, self.week_labels(monday), cells)
+        self.prefetch_weeks("schedule", self.load_schedule_week, business_id)
+
+
+    def patch_schedule_grid(self, model, event):
+        """
+        Change only the cell of a week grid affected by a single assignment changing.
+        Returns False if the change cannot be patched in and the grid needs rebuilding instead.
+        """
+
+        if not isinstance(event, (Change_Bus.Shift_Assigned, Change_Bus.Shift_Unassigned, Change_Bus.Shift_Published, Change_Bus.Week_Published)):
+            return False
+
+        if not self.is_current_before_change():
+            return False
+
+        if isinstance(event, Change_Bus.Week_Published):
+            if set(event.days) != set(self.day_columns):
+                return False
+
+            for payload, (row, column, times) in self.assignment_cells.items():
+                cell = model.cells.get((row, column))
+                if cell is not None and cell.get("status") == 1 and cell.get("payload") == payload:
+                    model.update_cell(row, column, self.shift_cell(payload, times, 4))
+
+            self.mark_current()
+            return True
+
+        payload = (event.employee_id, event.shift_id)
+
+        if isinstance(event, Change_Bus.Shift_Assigned):
+            shift = Database_Controller.get_shift_info(event.shift_id)
+            if shift[4] in self.day_columns:
+                row = self.employee_rows.get(event.employee_id)
+                if row is None:
+                    return False
+
+                column = self.day_columns[shift[4]]
+                self.shift_grid[row][1][column] = event.shift_id
+                self.shifts.append([event.employee_id, event.shift_id, column])
+                self.assignment_cells[payload] = (row, column, (shift[2], shift[3]))
+                model.update_cell(row, column, self.shift_cell(payload, (shift[2], shift[3]), event.status))
+
+        elif payload in self.assignment_cells:
+            row, column, times = self.assignment_cells[payload]
+
+            if isinstance(event, Change_Bus.Shift_Published):
+                model.update_cell(row, column, self.shift_cell(payload, times, 4))
+            else:
+                del self.assignment_cells[payload]
+                if any(cell[:2] == (row, column) for cell in self.assignment_cells.values()):
+                    return False
+
+                self.shift_grid[row][1][column] = ()
+                self.shifts.remove([event.employee_id, event.shift_id, column])
+                model.update_cell(row, column, None)
+
+        self.mark_current()
+
+        return True
+
+
+    def is_current_before_change(self):
+        """
+        Check whether the page was up to date before the most recent change to the database
+        """
+
+        return self.refreshed_key is not None and Database_Controller.get_data_version() - self.refreshed_key[0] <= 1
+
+
+    def mark_current(self):
+        """
+        Record that the page has been brought up to date with the database without rebuilding it
+        """
+
+        self.refreshed_key = (Database_Controller.get_data_version(),) + self.refreshed_key[1:]
+
+
+    def data_changed(self, event):
+        """
+        React to a change in the database by refreshing the page soon, if it is showing and built from that data
+        """
+
+        if self.REFRESH_ON_DATA_CHANGE and self.isVisible():
+            self.request_refresh()
+
+
     def remove_back_button(self):
         """ 
         Remove the back button from a layout
@@ -298,6 +900,119 @@ class Page(QMainWindow):
         pass 
 
 
+    def refresh_key(self):
+        """
+        Describe everything the page shows, so it is only rebuilt when this changes.
+        Pages not built from the current user's business data for this week are rebuilt every time they are refreshed.
+        """
+
+        if not self.REFRESH_ON_DATA_CHANGE:
+            return None
+
+        return (Database_Controller.get_data_version(), self.parent_stack.current_user, date.today(), self.week_offset)
+
+
+    def refresh_if_changed(self):
+        """
+        Rebuild the page unless nothing it shows has changed since it was last built
+        """
+
+        self.refresh_timer.stop()
+
+        key = self.refresh_key()
+        if key is None or key != self.refreshed_key:
+            self.refreshed_key = key
+            self.refresh()
+
+
+    def request_refresh(self):
+        """
+        Ask for the page to be refreshed shortly, so a burst of requests only rebuilds it once
+        """
+
+        self.refresh_timer.start(self.REFRESH_DELAY)
+
+
+    def run_while_busy(self, message, callback, fn, *args):
+        """
+        Run a slow function such as password hashing on the thread pool with a busy popup, then pass its result to the callback
+        """
+
+        if self.busy_worker is not None:
+            return
+
+        self.busy_dialog = QProgressDialog(message, None, 0, 0, self)
+        self.busy_dialog.setWindowTitle("Please Wait")
+        self.busy_dialog.setWindowModality(Qt.WindowModal)
+        self.busy_dialog.setMinimumDuration(self.BUSY_DELAY)
+
+        self.busy_callback = callback
+        self.busy_worker = Worker(fn, *args)
+        self.busy_worker.signals.finished.connect(self.busy_finished)
+        self.busy_worker.signals.failed.connect(self.busy_failed)
+
+        QThreadPool.globalInstance().start(self.busy_worker)
+
+
+    def busy_finished(self, result):
+        """
+        Close the busy popup and hand the result back to the page
+        """
+
+        self.stop_busy_worker()
+        self.busy_callback(result)
+
+
+    def busy_failed(self, error):
+        """
+        Close the busy popup and tell the user the details could not be used
+        """
+
+        self.stop_busy_worker()
+        Insufficient_details()
+
+
+    def stop_busy_worker(self):
+        """
+        Close the busy popup and allow another slow task to be started
+        """
+
+        self.busy_dialog.close()
+        self.busy_worker = None
+
+
+    def require_session(self, level, action, elevated=True):
+        """
+        Check the user's session allows an action, asking for their password again if it is no longer elevated
+        """
+
+        user, token = self.parent_stack.current_user, self.parent_stack.session_token
+
+        if Session_Manager.check_session(user, token, level, elevated):
+            return True
+
+        if not Session_Manager.check_session(user, token, level):
+            self.parent_stack.load_page("Login")
+            return False
+
+        password, entered = QInputDialog.getText(self, "Confirm Password", "Please re-enter your password:", QLineEdit.Password)
+        if entered:
+            self.run_while_busy("Checking password...", lambda is_matching: self.session_confirmed(is_matching, action), Database_Controller.check_password, password, user)
+
+        return False
+
+
+    def session_confirmed(self, is_matching, action):
+        """
+        Elevate the session and carry on with the action if the password was re-entered correctly
+        """
+
+        if is_matching and Session_Manager.elevate_session(self.parent_stack.current_user, self.parent_stack.session_token):
+            action()
+        else:
+            Incorrect_details()
+
+
     def go_back(self):
         """
         Return to previous page
@@ -472,20 +1187,28 @@ class Create_Managing_Account(Page):
             if " " in first_name or " " in last_name:
                 Insufficient_details()
             else:
-                Database_Controller.add_employee(business_id, first_name, last_name, None, None, position_id, None, None, None, None, password)
-                id = Database_Controller.find_new_employee()
-                self.input_fields[0].input_field.clear()
-                self.input_fields[1].input_field.clear()
-                self.input_fields[2].input_field.clear()
-
-                self.parent_stack.current_user = id
-                self.parent_stack.editing_user = id
-                self.parent_stack.load_page("Initialise Employee Details")
+                self.run_while_busy("Creating account...", self.manager_created, Database_Controller.add_employee, business_id, first_name, last_name, None, None, position_id, None, None, None, None, password)
 
         else:
             No_details()
 
 
+    def manager_created(self, result):
+        """
+        Load the edit details page once the manager has been added in the background
+        """
+
+        id = Database_Controller.find_new_employee()
+        self.input_fields[0].input_field.clear()
+        self.input_fields[1].input_field.clear()
+        self.input_fields[2].input_field.clear()
+
+        self.parent_stack.current_user = id
+        self.parent_stack.session_token = Session_Manager.start_session(id, Session_Manager.MANAGER)
+        self.parent_stack.editing_user = id
+        self.parent_stack.load_page("Initialise Employee Details")
+
+
 class Employee_Login_Page(Page):
     """
     The page that allows employees to log in to their accounts
@@ -529,13 +1252,28 @@ class Employee_Login_Page(Page):
         try:
             first_name, last_name = self.inputs[0].input_field.text().split(' ')
             password = self.inputs[1].input_field.text()
-            id, Correct_Details = Database_Controller.employee_login(first_name, last_name, password)
+        except:
+            Insufficient_details()
+            return
+
+        self.run_while_busy("Logging in...", self.login_checked, Database_Controller.employee_login, first_name, last_name, password)
+
+
+    def login_checked(self, result):
+        """
+        Log the employee in once their password has been checked in the background
+        """
+
+        try:
+            id, Correct_Details = result
             if Correct_Details:
                 self.inputs[0].input_field.clear()
                 self.inputs[1].input_field.clear()
                 self.parent_stack.current_user = id
-                position_id = Database_Controller.find_employee(id)[6]
+                position_id = Database_Controller.find_employee_fields(id, "position_id")["position_id"]
                 position_title = Database_Controller.find_position(position_id)
+                level = Session_Manager.MANAGER if position_title == "Manager" else Session_Manager.EMPLOYEE
+                self.parent_stack.session_token = Session_Manager.start_session(id, level)
                 if position_title == "Manager":
                     self.parent_stack.load_page("Manager Login")
                 else:
@@ -588,10 +1326,11 @@ class Manager_Login_Page(Page):
 
     def manager_login(self):
         """
-        Loads the mainpage for a manager
+        Loads the mainpage for a manager, using the session from their login rather than checking their password again
         """
 
-        self.parent_stack.load_page("Managers Main Page")
+        if self.require_session(Session_Manager.MANAGER, self.manager_login, elevated=False):
+            self.parent_stack.load_page("Managers Main Page")
 
 
 class Edit_Employee_Details(Page):
@@ -607,7 +1346,7 @@ class Edit_Employee_Details(Page):
         super().__init__()
         self.parent_stack = parent_stack
 
-        self.details = [0, 0, "", "", "", "", "", 0, 0, 0, 0, ""]
+        self.details = dict.fromkeys(PROFILE_FIELDS, "")
 
         self.employee_photo = QLabel()
         self.name_title = QLabel()
@@ -617,10 +1356,6 @@ class Edit_Employee_Details(Page):
         photo_layout = QVBoxLayout()
         info_layout = QVBoxLayout()
 
-        if self.employee_photo.pixmap():
-            pixmap = self.make_circle(self.employee_photo.pixmap())
-            self.employee_photo.setPixmap(pixmap)
-
         self.employee_photo.setAlignment(Qt.AlignTop)
         photo_layout.addWidget(self.employee_photo, alignment=Qt.AlignTop | Qt.AlignCenter)
         employee_badge.addLayout(photo_layout)
@@ -643,13 +1378,13 @@ class Edit_Employee_Details(Page):
         right_input_column = QVBoxLayout()
         input_layout = QHBoxLayout()
 
-        self.first_name_input = self.create_input_field("First Name:", self.details[2])
-        self.last_name_input = self.create_input_field("Last Name:", self.details[3])
-        self.email_input = self.create_input_field("Email:", str(self.details[4]))
-        self.phone_number_input = self.create_input_field("Phone Number:", str(self.details[5]))
-        self.hourly_rate_input = self.create_input_field("Hourly Rate:", str(self.details[7]))
-        self.minimum_hours_input = self.create_input_field("Minimum Hours:", str(self.details[10]))
-        self.maximum_hours_input = self.create_input_field("Maximum Hours:", str(self.details[11]))
+        self.first_name_input = self.create_input_field("First Name:", self.details["first_name"])
+        self.last_name_input = self.create_input_field("Last Name:", self.details["last_name"])
+        self.email_input = self.create_input_field("Email:", str(self.details["email"]))
+        self.phone_number_input = self.create_input_field("Phone Number:", str(self.details["phone_number"]))
+        self.hourly_rate_input = self.create_input_field("Hourly Rate:", str(self.details["hourly_rate"]))
+        self.minimum_hours_input = self.create_input_field("Minimum Hours:", str(self.details["minimum_hours"]))
+        self.maximum_hours_input = self.create_input_field("Maximum Hours:", str(self.details["maximum_hours"]))
         self.choose_photo_button = self.create_button("Employee Photo", self.FORM_WIDTH, self.BUTTON_FONT, self.select_photo)
         self.submit_button = self.create_button("Submit", self.FORM_WIDTH, self.BUTTON_FONT, self.submit)
         self.delete_button = self.create_button("Delete Employee", self.FORM_WIDTH, self.BUTTON_FONT, self.delete_employee)
@@ -686,31 +1421,27 @@ class Edit_Employee_Details(Page):
         Refreshes the page with the employees information
         """
         
-        self.details = Database_Controller.find_employee(self.parent_stack.editing_user)
-        position = Database_Controller.find_position(self.details[6])
-        business = Database_Controller.find_business(self.details[1])
+        self.details = Database_Controller.find_employee_fields(self.parent_stack.editing_user, *PROFILE_FIELDS)
+        position = Database_Controller.find_position(self.details["position_id"])
+        business = Database_Controller.find_business(self.details["business_id"])
 
         self.business_title.setText(f"{business}")
         self.job_title.setText(f"{position}")
-        self.name_title.setText(f"{self.details[2]} {self.details[3]}")
+        self.name_title.setText(f"{self.details['first_name']} {self.details['last_name']}")
 
-        if self.details[-4]:
-            pixmap = QPixmap()
-            if pixmap.loadFromData(self.details[-4]):
-                circular_pixmap = self.make_circle(pixmap)
-                self.employee_photo.setPixmap(circular_pixmap)
-            else:
-                self.employee_photo.clear()
+        pixmap = self.load_thumbnail(self.parent_stack.editing_user)
+        if pixmap:
+            self.employee_photo.setPixmap(pixmap)
         else:
             self.employee_photo.clear()
 
-        self.first_name_input.input_field.setPlaceholderText(self.details[2])
-        self.last_name_input.input_field.setPlaceholderText(self.details[3])
-        self.email_input.input_field.setPlaceholderText(str(self.details[4]))
-        self.phone_number_input.input_field.setPlaceholderText(str(self.details[5]))
-        self.hourly_rate_input.input_field.setPlaceholderText(str(self.details[7]))
-        self.minimum_hours_input.input_field.setPlaceholderText(str(self.details[10]))
-        self.maximum_hours_input.input_field.setPlaceholderText(str(self.details[11]))
+        self.first_name_input.input_field.setPlaceholderText(self.details["first_name"])
+        self.last_name_input.input_field.setPlaceholderText(self.details["last_name"])
+        self.email_input.input_field.setPlaceholderText(str(self.details["email"]))
+        self.phone_number_input.input_field.setPlaceholderText(str(self.details["phone_number"]))
+        self.hourly_rate_input.input_field.setPlaceholderText(str(self.details["hourly_rate"]))
+        self.minimum_hours_input.input_field.setPlaceholderText(str(self.details["minimum_hours"]))
+        self.maximum_hours_input.input_field.setPlaceholderText(str(self.details["maximum_hours"]))
 
 
     def create_input_field(self, label, data, is_password=False):
@@ -748,6 +1479,7 @@ class Edit_Employee_Details(Page):
 
         options = QFileDialog.Options()
         self.file_path, _ = QFileDialog.getOpenFileName(self, "Choose Employee Photo", "", "Images (*.png *.jpg *.jpeg *.bmp);;All Files (*)", options=options)
+        self.circular_pixmap = None
         if self.file_path:
             pixmap = QPixmap(self.file_path)
             if not pixmap.isNull():
@@ -755,38 +1487,20 @@ class Edit_Employee_Details(Page):
                 self.employee_photo.setPixmap(self.circular_pixmap)
 
 
-    def make_circle(self, pixmap, size=140):
-        """
-        Make the photo inputted by the user into a circle
-        """
-
-        image = pixmap.toImage().scaled(size, size, Qt.AspectRatioMode.KeepAspectRatioByExpanding,
-                                        Qt.TransformationMode.SmoothTransformation)
-
-        circular_image = QImage(size, size, QImage.Format.Format_ARGB32)
-        circular_image.fill(Qt.GlobalColor.transparent)
-
-        painter = QPainter(circular_image)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-
-        path = QPainterPath()
-        path.addEllipse(0, 0, size, size)
-        painter.setClipPath(path)
-
-        painter.drawPixmap(0, 0, QPixmap.fromImage(image))
-        painter.end()
-
-        return QPixmap.fromImage(circular_image)
-    
-
     def delete_employee(self):
         """
         Removes an employee from the database
         """
 
+        import Schedule_employees
+
+        if not self.require_session(Session_Manager.MANAGER, self.delete_employee):
+            return
+
         shifts = Schedule_employees.get_shifts_in_week(self.parent_stack.current_user)
         Schedule_employees.clear_shifts(self.parent_stack.current_user, shifts)
         Database_Controller.delete_employee(self.parent_stack.editing_user)
+        self.thumbnail_cache.discard(self.parent_stack.editing_user)
         self.parent_stack.load_page("Managers Main Page")
 
     
@@ -795,7 +1509,17 @@ class Edit_Employee_Details(Page):
         Gives an employee the standard password for the program
         """
 
-        Database_Controller.update_password('1234', self.parent_stack.editing_user)
+        if not self.require_session(Session_Manager.MANAGER, self.reset_password):
+            return
+
+        self.run_while_busy("Resetting password...", self.password_reset, Database_Controller.update_password, '1234', self.parent_stack.editing_user)
+
+
+    def password_reset(self, result):
+        """
+        Return to the main page once the password has been reset in the background
+        """
+
         self.parent_stack.load_page("Managers Main Page")
 
 
@@ -810,19 +1534,23 @@ class Edit_Employee_Details(Page):
         except:
             self.file_path = None
 
-        done = Database_Controller.update_employee(self.first_name_input.input_field.text(), self.last_name_input.input_field.text(), self.email_input.input_field.text(), self.phone_number_input.input_field.text(), self.hourly_rate_input.input_field.text(), self.minimum_hours_input.input_field.text(), self.maximum_hours_input.input_field.text(), self.file_path, self.parent_stack.editing_user)
+        thumbnail = self.pixmap_to_png(self.circular_pixmap) if self.file_path and self.circular_pixmap else None
+
+        done = Database_Controller.update_employee(self.first_name_input.input_field.text(), self.last_name_input.input_field.text(), self.email_input.input_field.text(), self.phone_number_input.input_field.text(), self.hourly_rate_input.input_field.text(), self.minimum_hours_input.input_field.text(), self.maximum_hours_input.input_field.text(), self.file_path, self.parent_stack.editing_user, thumbnail)
         if done == False:
             Insufficient_details()
         else:
+            if self.file_path:
+                self.thumbnail_cache.discard(self.parent_stack.editing_user)
             
             self.refresh()
-            self.first_name_input.input_field.setPlaceholderText(self.details[2])
-            self.last_name_input.input_field.setPlaceholderText(self.details[3])
-            self.email_input.input_field.setPlaceholderText(str(self.details[4]))
-            self.phone_number_input.input_field.setPlaceholderText(str(self.details[5]))
-            self.hourly_rate_input.input_field.setPlaceholderText(str(self.details[7]))
-            self.minimum_hours_input.input_field.setPlaceholderText(str(self.details[10]))
-            self.maximum_hours_input.input_field.setPlaceholderText(str(self.details[11]))
+            self.first_name_input.input_field.setPlaceholderText(self.details["first_name"])
+            self.last_name_input.input_field.setPlaceholderText(self.details["last_name"])
+            self.email_input.input_field.setPlaceholderText(str(self.details["email"]))
+            self.phone_number_input.input_field.setPlaceholderText(str(self.details["phone_number"]))
+            self.hourly_rate_input.input_field.setPlaceholderText(str(self.details["hourly_rate"]))
+            self.minimum_hours_input.input_field.setPlaceholderText(str(self.details["minimum_hours"]))
+            self.maximum_hours_input.input_field.setPlaceholderText(str(self.details["maximum_hours"]))
 
             self.first_name_input.input_field.clear()
             self.last_name_input.input_field.clear()
@@ -847,7 +1575,7 @@ class Initialise_Employee_Details(Page):
         super().__init__()
         self.parent_stack = parent_stack
 
-        self.details = [0, 0, "", "", "", "", "", 0, 0, 0, 0, ""]
+        self.details = dict.fromkeys(PROFILE_FIELDS, "")
 
         self.employee_photo = QLabel()
         self.name_title = QLabel()
@@ -857,10 +1585,6 @@ class Initialise_Employee_Details(Page):
         photo_layout = QVBoxLayout()
         info_layout = QVBoxLayout()
 
-        if self.employee_photo.pixmap():
-            pixmap = self.make_circle(self.employee_photo.pixmap())
-            self.employee_photo.setPixmap(pixmap)
-
         self.employee_photo.setAlignment(Qt.AlignTop)
         photo_layout.addWidget(self.employee_photo, alignment=Qt.AlignTop | Qt.AlignCenter)
         employee_badge.addLayout(photo_layout)
@@ -883,13 +1607,13 @@ class Initialise_Employee_Details(Page):
         right_input_column = QVBoxLayout()
         input_layout = QHBoxLayout()
 
-        self.first_name_input = self.create_input_field("First Name:", self.details[2])
-        self.last_name_input = self.create_input_field("Last Name:", self.details[3])
-        self.email_input = self.create_input_field("Email:", str(self.details[4]))
-        self.phone_number_input = self.create_input_field("Phone Number:", str(self.details[5]))
-        self.hourly_rate_input = self.create_input_field("Hourly Rate:", str(self.details[7]))
-        self.minimum_hours_input = self.create_input_field("Minimum Hours:", str(self.details[10]))
-        self.maximum_hours_input = self.create_input_field("Maximum Hours:", str(self.details[11]))
+        self.first_name_input = self.create_input_field("First Name:", self.details["first_name"])
+        self.last_name_input = self.create_input_field("Last Name:", self.details["last_name"])
+        self.email_input = self.create_input_field("Email:", str(self.details["email"]))
+        self.phone_number_input = self.create_input_field("Phone Number:", str(self.details["phone_number"]))
+        self.hourly_rate_input = self.create_input_field("Hourly Rate:", str(self.details["hourly_rate"]))
+        self.minimum_hours_input = self.create_input_field("Minimum Hours:", str(self.details["minimum_hours"]))
+        self.maximum_hours_input = self.create_input_field("Maximum Hours:", str(self.details["maximum_hours"]))
         self.choose_photo_button = self.create_button("Employee Photo", self.FORM_WIDTH, self.BUTTON_FONT, self.select_photo)
         self.submit_button = self.create_button("Submit", self.FORM_WIDTH, self.BUTTON_FONT, self.submit)
 
@@ -922,31 +1646,27 @@ class Initialise_Employee_Details(Page):
         Refreshes the page with the employees information
         """
         
-        self.details = Database_Controller.find_employee(self.parent_stack.editing_user)
-        position = Database_Controller.find_position(self.details[6])
-        business = Database_Controller.find_business(self.details[1])
+        self.details = Database_Controller.find_employee_fields(self.parent_stack.editing_user, *PROFILE_FIELDS)
+        position = Database_Controller.find_position(self.details["position_id"])
+        business = Database_Controller.find_business(self.details["business_id"])
 
         self.business_title.setText(f"{business}")
         self.job_title.setText(f"{position}")
-        self.name_title.setText(f"{self.details[2]} {self.details[3]}")
+        self.name_title.setText(f"{self.details['first_name']} {self.details['last_name']}")
 
-        if self.details[-4]:
-            pixmap = QPixmap()
-            if pixmap.loadFromData(self.details[-4]):
-                circular_pixmap = self.make_circle(pixmap)
-                self.employee_photo.setPixmap(circular_pixmap)
-            else:
-                self.employee_photo.clear()
+        pixmap = self.load_thumbnail(self.parent_stack.editing_user)
+        if pixmap:
+            self.employee_photo.setPixmap(pixmap)
         else:
             self.employee_photo.clear()
 
-        self.first_name_input.input_field.setPlaceholderText(self.details[2])
-        self.last_name_input.input_field.setPlaceholderText(self.details[3])
-        self.email_input.input_field.setPlaceholderText(str(self.details[4]))
-        self.phone_number_input.input_field.setPlaceholderText(str(self.details[5]))
-        self.hourly_rate_input.input_field.setPlaceholderText(str(self.details[7]))
-        self.minimum_hours_input.input_field.setPlaceholderText(str(self.details[10]))
-        self.maximum_hours_input.input_field.setPlaceholderText(str(self.details[11]))
+        self.first_name_input.input_field.setPlaceholderText(self.details["first_name"])
+        self.last_name_input.input_field.setPlaceholderText(self.details["last_name"])
+        self.email_input.input_field.setPlaceholderText(str(self.details["email"]))
+        self.phone_number_input.input_field.setPlaceholderText(str(self.details["phone_number"]))
+        self.hourly_rate_input.input_field.setPlaceholderText(str(self.details["hourly_rate"]))
+        self.minimum_hours_input.input_field.setPlaceholderText(str(self.details["minimum_hours"]))
+        self.maximum_hours_input.input_field.setPlaceholderText(str(self.details["maximum_hours"]))
 
 
     def create_input_field(self, label, data, is_password=False):
@@ -984,35 +1704,12 @@ class Initialise_Employee_Details(Page):
 
         options = QFileDialog.Options()
         self.file_path, _ = QFileDialog.getOpenFileName(self, "Choose Employee Photo", "", "Images (*.png *.jpg *.jpeg *.bmp);;All Files (*)", options=options)
+        self.circular_pixmap = None
         if self.file_path:
-            pixmap = QPixmap(self.file_path)
-            if not pixmap.isNull():
-                self.circular_pixmap = self.make_circle(pixmap)
-                self.employee_photo.setPixmap(self.circular_pixmap)
-
-
-    def make_circle(self, pixmap, size=140):
-        """
-        Make the photo inputted by the user into a circle
-        """
-
-        image = pixmap.toImage().scaled(size, size, Qt.AspectRatioMode.KeepAspectRatioByExpanding,
-                                        Qt.TransformationMode.SmoothTransformation)
-
-        circular_image = QImage(size, size, QImage.Format.Format_ARGB32)
-        circular_image.fill(Qt.GlobalColor.transparent)
-
-        painter = QPainter(circular_image)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-
-        path = QPainterPath()
-        path.addEllipse(0, 0, size, size)
-        painter.setClipPath(path)
-
-        painter.drawPixmap(0, 0, QPixmap.fromImage(image))
-        painter.end()
-
-        return QPixmap.fromImage(circular_image)
+            pixmap = QPixmap(self.file_path)
+            if not pixmap.isNull():
+                self.circular_pixmap = self.make_circle(pixmap)
+                self.employee_photo.setPixmap(self.circular_pixmap)
 
 
     def submit(self):
@@ -1026,19 +1723,23 @@ class Initialise_Employee_Details(Page):
         except:
             self.file_path = None
 
-        done = Database_Controller.update_employee(self.first_name_input.input_field.text(), self.last_name_input.input_field.text(), self.email_input.input_field.text(), self.phone_number_input.input_field.text(), self.hourly_rate_input.input_field.text(), self.minimum_hours_input.input_field.text(), self.maximum_hours_input.input_field.text(), self.file_path, self.parent_stack.editing_user)
+        thumbnail = self.pixmap_to_png(self.circular_pixmap) if self.file_path and self.circular_pixmap else None
+
+        done = Database_Controller.update_employee(self.first_name_input.input_field.text(), self.last_name_input.input_field.text(), self.email_input.input_field.text(), self.phone_number_input.input_field.text(), self.hourly_rate_input.input_field.text(), self.minimum_hours_input.input_field.text(), self.maximum_hours_input.input_field.text(), self.file_path, self.parent_stack.editing_user, thumbnail)
         if done == False:
             Insufficient_details()
         else:
+            if self.file_path:
+                self.thumbnail_cache.discard(self.parent_stack.editing_user)
             
             self.refresh()
-            self.first_name_input.input_field.setPlaceholderText(self.details[2])
-            self.last_name_input.input_field.setPlaceholderText(self.details[3])
-            self.email_input.input_field.setPlaceholderText(str(self.details[4]))
-            self.phone_number_input.input_field.setPlaceholderText(str(self.details[5]))
-            self.hourly_rate_input.input_field.setPlaceholderText(str(self.details[7]))
-            self.minimum_hours_input.input_field.setPlaceholderText(str(self.details[10]))
-            self.maximum_hours_input.input_field.setPlaceholderText(str(self.details[11]))
+            self.first_name_input.input_field.setPlaceholderText(self.details["first_name"])
+            self.last_name_input.input_field.setPlaceholderText(self.details["last_name"])
+            self.email_input.input_field.setPlaceholderText(str(self.details["email"]))
+            self.phone_number_input.input_field.setPlaceholderText(str(self.details["phone_number"]))
+            self.hourly_rate_input.input_field.setPlaceholderText(str(self.details["hourly_rate"]))
+            self.minimum_hours_input.input_field.setPlaceholderText(str(self.details["minimum_hours"]))
+            self.maximum_hours_input.input_field.setPlaceholderText(str(self.details["maximum_hours"]))
 
             self.first_name_input.input_field.clear()
             self.last_name_input.input_field.clear()
@@ -1055,6 +1756,8 @@ class Manager_MainPage(Page):
     The managers main page of the program
     """
 
+    REFRESH_ON_DATA_CHANGE = True
+
     def __init__(self, parent_stack):
         """
         Run the methods that setup the header and the tables
@@ -1067,6 +1770,17 @@ class Manager_MainPage(Page):
         self.layout = QVBoxLayout(self)
         self.setLayout(self.layout)
 
+        self.schedule_worker = None
+        self.schedule_cancelled = threading.Event()
+
+        self.shifts = []
+        self.shift_grid = []
+        self.group_by_position = False
+        self.optimise = False
+        self.schedule_model, self.schedule_table, self.scroll_area = self.create_grid(Grid_Cell_Delegate(self))
+        self.schedule_table.clicked.connect(self.shift_clicked)
+        self.schedule_table.verticalHeader().sectionClicked.connect(self.on_name_clicked)
+
         self.add_schedule_grid()
         self.add_header()
 
@@ -1088,16 +1802,18 @@ class Manager_MainPage(Page):
         log_out_button = self.create_button("Log Out", 100, QFont('Cascadia Mono', 12), self.logout, height = 50)
         manage_employees_button = self.create_button("Manage Employees", 200, QFont('Cascadia Mono', 12), self.manage_employees, height = 50)
         manage_shifts_button = self.create_button("Manage Shifts", 160, QFont('Cascadia Mono', 12), self.manage_shifts, height = 50)
-        generate_schedule_button = self.create_button("Generate Schedule", 200, QFont('Cascadia Mono', 12), self.generate_schedule, height = 50)
+        self.group_button = self.create_button("Group By Position", 200, QFont('Cascadia Mono', 12), self.toggle_grouping, height = 50)
+        self.generate_schedule_button = self.create_button("Generate Schedule", 200, QFont('Cascadia Mono', 12), self.generate_schedule, height = 50)
+        self.optimise_button = self.create_button("Optimise: Off", 160, QFont('Cascadia Mono', 12), self.toggle_optimise, height = 50)
         clear_schedule_button = self.create_button("Clear Schedule", 200, QFont('Cascadia Mono', 12), self.clear_schedule, height = 50)
         publish_schedule_button = self.create_button("Publish Schedule", 200, QFont('Cascadia Mono', 12), self.publish_schedule, height = 50)
         
-        left_buttons = [manage_shifts_button, manage_employees_button]
+        left_buttons = [manage_shifts_button, manage_employees_button, self.group_button] + self.create_week_buttons()
         for button in left_buttons:
             header_layout.addSpacing(10)
             header_layout.addWidget(button)
         
-        right_buttons = [publish_schedule_button, generate_schedule_button,clear_schedule_button,log_out_button]
+        right_buttons = [publish_schedule_button, self.optimise_button, self.generate_schedule_button,clear_schedule_button,log_out_button]
         header_layout.addSpacing(2400)
         for button in right_buttons:
             header_layout.addWidget(button)
@@ -1106,153 +1822,161 @@ class Manager_MainPage(Page):
 
     def add_schedule_grid(self):
         """
-        Setup the table to display the shift information
+        Fill the table model with the shift information
         """     
 
-        if self.parent_stack.current_user == None:
-            self.schedule_table = QTableWidget(self)
-            scroll_area = QScrollArea(self)
-            people_names = ['placeholder']
-            self.target_cells = {(1,1)}
-            self.shift_grid = [[1], [2]]
-            
-        else: 
-            people_names = []
-            self.shift_grid = []
+        self.fill_schedule_grid(self.schedule_model, self.group_by_position)
+
+
+    def toggle_grouping(self):
+        """
+        Switch between listing employees in order and grouping them by position
+        """
+
+        self.group_by_position = not self.group_by_position
+        self.group_button.setText("Ungroup" if self.group_by_position else "Group By Position")
+        self.refresh()
 
-            business_id = Database_Controller.find_employee(self.parent_stack.current_user)[1]
-            names = Database_Controller.get_employees(business_id)
-            people_names = [str(names[i]) for i in range(len(names))]
-    
-            day_of_week = date.today().isoweekday()
-            monday_this_week = date.today() - timedelta(days=(day_of_week - 1))
-            week_dates = [(monday_this_week + timedelta(days=i)).strftime("%d-%m-20%y") for i in range(7)]
-
-            for name in names:
-                firstname,lastname = str(name).split(" ")
-                self.shift_grid.append([Database_Controller.find_employee_id(firstname, lastname)[0], [()]*7])
-
-            one_time_shifts = []
-
-            for day in week_dates:
-                shifts = Database_Controller.get_assigned_shifts(int(business_id), str(day))
-                for index, shift in enumerate(shifts):
-                    days,month,year = day.split("-")
-                    weekday = date(int(year),int(month),int(days)).isoweekday()
-                    list_for_shift = list(shifts[index])
-                    list_for_shift.append(weekday-1)
-                    one_time_shifts.append(list_for_shift)
-            
 
-            recurring_shifts = []
+    def toggle_optimise(self):
+        """
+        Switch whether generated schedules are improved by a local search after the greedy pass
+        """
 
-            for index, name in enumerate(DAYS_OF_WEEK):
-                shifts = Database_Controller.get_assigned_shifts(int(business_id), str(name))
+        self.optimise = not self.optimise
+        self.optimise_button.setText("Optimise: On" if self.optimise else "Optimise: Off")
 
-                for ind in range(len(shifts)):
 
-                    days,month,year = week_dates[index].split("-")
-                    weekday = date(int(year),int(month),int(days)).isoweekday()
-                    list_for_shift = list(shifts[ind])
-                    list_for_shift.append(weekday-1)
-                    recurring_shifts.append(list_for_shift)
+    def shift_cell(self, payload, times, status):
+        """
+        Create the grid cell showing the times of a shift and whether it is published
+        """
 
-            self.shifts = one_time_shifts + recurring_shifts
+        if status == 1:
+            text = f"Pending Publish: \n{times[0]} - {times[1]}"
+        elif status == 4:
+            text = f"{times[0]} - {times[1]}"
+        else:
+            text = ""
 
-            for day in range(7):
-                for index, employee in enumerate(self.shift_grid):
-                    for shift in self.shifts:
-                        if employee[0] == shift[0]:
-                            self.shift_grid[index][1][shift[2]] = shift[1]
+        return {"text": text, "colour": "#333333", "text_colour": "white", "status": status, "payload": payload}
 
-            self.target_cells = set()
-            for shift in range(len(self.shifts)):
-                employee_details = Database_Controller.find_employee(self.shifts[shift][0])
-                employee_name = f"{employee_details[2]} {employee_details[3]}"
-                self.target_cells.add((people_names.index(employee_name), self.shifts[shift][2]))
 
-        try:
-            header_font = QFont("Cascadia Mono", 12, QFont.Bold)
+    def data_changed(self, event):
+        """
+        Patch the cell of a changed assignment, or rebuild the grid for any other change
+        """
 
-            self.schedule_table.setRowCount(len(people_names))
-            self.schedule_table.setVerticalHeaderLabels(people_names)
-            self.schedule_table.verticalHeader().setFont(header_font)
-            self.schedule_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        if not self.patch_schedule_grid(self.schedule_model, event):
+            super().data_changed(event)
 
-            for row in range(self.schedule_table.rowCount()):
-                self.schedule_table.setRowHeight(row, 100)
 
-            self.schedule_table.setColumnCount(7)
-            self.schedule_table.setHorizontalHeaderLabels(DAYS_OF_WEEK)
-            self.schedule_table.horizontalHeader().setFont(header_font)
-            self.schedule_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    def shift_clicked(self, index):
+        """
+        Opens shift details when a shift is clicked
+        """
+
+        shift = index.data(PAYLOAD_ROLE)
+        if shift is not None:
+            self.parent_stack.current_shift = shift[1]
+            self.parent_stack.load_page("Assigned Shift Details")
+        self.request_refresh()
 
-            self.schedule_table.setStyleSheet(self.TIMETABLE_GRID_STYLE)
 
-            shift_data = Add_Assigned_Shift_Data_Manager(self.target_cells, self.shift_grid)
-            self.schedule_table.setItemDelegate(shift_data)
-        
-            self.schedule_table.setSelectionMode(QAbstractItemView.SingleSelection)
-            self.schedule_table.setSelectionBehavior(QAbstractItemView.SelectItems)
+    def on_name_clicked(self, row_index):
+        """
+        Handle clicking on a name in the vertical header
+        """
+
+        employee_id = self.shift_grid[row_index][0]
+        if employee_id is None:
+            return
+
+        self.parent_stack.editing_user = employee_id
+        self.parent_stack.load_page("Edit Employee Details")
 
-            for row in range(self.schedule_table.rowCount()):
-                for col in range(self.schedule_table.columnCount()):
-                    item = self.schedule_table.item(row, col)
-                    if item is None:
-                        item = QTableWidgetItem()
-                        self.schedule_table.setItem(row, col, item)
-                    item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
+    def generate_schedule(self):
+        """
+        Start generating a new schedule in the background with a progress popup
+        """
 
-            self.schedule_table.verticalHeader().sectionClicked.connect(self.on_name_clicked)
+        import Schedule_employees
 
-            scroll_area.setWidget(self.schedule_table)
-            scroll_area.setWidgetResizable(True)
+        if self.schedule_worker is not None:
+            return
 
-            scroll_area.setMinimumSize(1500, 750)
+        self.schedule_cancelled.clear()
+        self.progress_dialog = QProgressDialog("Generating schedule...", "Cancel", 0, 100, self)
+        self.progress_dialog.setWindowTitle("Generate Schedule")
+        self.progress_dialog.setWindowModality(Qt.WindowModal)
+        self.progress_dialog.setMinimumDuration(0)
+        self.progress_dialog.canceled.connect(self.schedule_cancelled.set)
 
-            self.schedule_table.cellClicked.disconnect()
-            self.schedule_table.cellClicked.connect(self.shift_clicked)
+        self.schedule_worker = Worker(Schedule_employees.plan_new_schedule, self.parent_stack.current_user, report_progress=True, cancelled=self.schedule_cancelled.is_set, monday=self.week_start(), improve=self.optimise, time_budget=OPTIMISE_TIME_BUDGET)
+        self.schedule_worker.signals.progress.connect(self.progress_dialog.setValue)
+        self.schedule_worker.signals.finished.connect(self.schedule_finished)
+        self.schedule_worker.signals.failed.connect(self.schedule_failed)
 
-        except:
-            pass
+        self.generate_schedule_button.setEnabled(False)
+        QThreadPool.globalInstance().start(self.schedule_worker)
 
 
-    def shift_clicked(self, row, column):
+    def schedule_finished(self, plan):
         """
-        Opens shift details when a shift is clicked
+        Show the generated schedule's coverage, cost and changes, then save it in one go if the manager accepts it
         """
 
-        if (row, column) in self.target_cells:
-            self.parent_stack.current_shift = self.shift_grid[row][1][column]
-            self.parent_stack.load_page("Assigned Shift Details")
-        self.refresh()
+        import Schedule_employees
 
+        cancelled = self.schedule_cancelled.is_set()
+        self.stop_schedule_worker()
 
-    def on_name_clicked(self, row_index):
+        if plan is None or cancelled or not plan.has_changes() or not Confirm_Schedule(plan).accepted:
+            return
+
+        try:
+            Schedule_employees.apply_schedule(plan)
+        except sqlite3.Error as error:
+            Schedule_Failed(error)
+
+        self.request_refresh()
+
+
+    def schedule_failed(self, error):
         """
-        Handle clicking on a name in the vertical header
+        Leave the saved schedule untouched if generating a new one went wrong
         """
 
-        first_name, last_name = self.schedule_table.verticalHeaderItem(row_index).text().split(" ")
-        id = Database_Controller.find_employee_id(first_name, last_name)
+        self.stop_schedule_worker()
+        Schedule_Failed(error)
 
-        self.parent_stack.editing_user = id[0]
-        self.parent_stack.load_page("Edit Employee Details")
 
-    def generate_schedule(self):
-        Schedule_employees.create_new_schedule(self.parent_stack.current_user)
-        self.refresh()
+    def stop_schedule_worker(self):
+        """
+        Close the progress popup and allow another schedule to be generated
+        """
+
+        self.progress_dialog.canceled.disconnect(self.schedule_cancelled.set)
+        self.progress_dialog.close()
+        self.schedule_worker = None
+        self.generate_schedule_button.setEnabled(True)
+
 
     def clear_schedule(self):
-        Schedule_employees.clear_schedule(self.parent_stack.current_user)
-        self.refresh()
+        import Schedule_employees
+
+        Schedule_employees.clear_schedule(self.parent_stack.current_user, self.week_start())
+        self.request_refresh()
 
     def publish_schedule(self):
-        for shift in self.shifts:
-            shift_id = shift[1]
-            employee_id = shift[0]
-            Database_Controller.publish_shift(shift_id, employee_id)
-        self.refresh()
+        """
+        Publish every pending shift shown in this week's schedule at once
+        """
+
+        business_id = Database_Controller.find_employee_business(self.parent_stack.current_user)
+        count = Database_Controller.publish_week(business_id, self.day_columns)
+        self.request_refresh()
+        Schedule_Published(count)
 
 
     def refresh(self):
@@ -1285,7 +2009,9 @@ class Manager_MainPage(Page):
         Log the user out and return to the start page
         """
 
+        Session_Manager.end_session(self.parent_stack.current_user)
         self.parent_stack.current_user = None
+        self.parent_stack.session_token = None
         self.parent_stack.load_page("Start Page")
 
 
@@ -1294,6 +2020,8 @@ class Employee_MainPage(Page):
     The Employees main page of the program
     """
 
+    REFRESH_ON_DATA_CHANGE = True
+
     def __init__(self, parent_stack):
         """
         Run the methods that setup the header and the tables
@@ -1306,6 +2034,12 @@ class Employee_MainPage(Page):
         self.layout = QVBoxLayout(self)
         self.setLayout(self.layout)
 
+        self.shifts = []
+        self.shift_grid = []
+        self.team_view = False
+        self.own_name = None
+        self.schedule_model, self.schedule_table, self.scroll_area = self.create_grid(Grid_Cell_Delegate(self))
+
         self.add_schedule_grid()
         self.add_header()
 
@@ -1327,9 +2061,13 @@ class Employee_MainPage(Page):
         request_time_off_button = self.create_button("Request Time Off", 200, QFont('Cascadia Mono', 12), self.time_off, height = 50)
         reset_password_button = self.create_button("Reset Password", 200, QFont('Cascadia Mono', 12), self.reset_password, height = 50)
         log_out_button = self.create_button("Log Out", 100, QFont('Cascadia Mono', 12), self.logout, height = 50)
+        self.team_view_button = self.create_button("Team View", 150, QFont('Cascadia Mono', 12), self.toggle_team_view, height = 50)
         
         header_layout.addSpacing(25)
         header_layout.addWidget(request_time_off_button)
+        header_layout.addWidget(self.team_view_button)
+        for button in self.create_week_buttons():
+            header_layout.addWidget(button)
         header_layout.addSpacing(2650)
         header_layout.addWidget(reset_password_button)
         header_layout.addSpacing(25)
@@ -1355,112 +2093,95 @@ class Employee_MainPage(Page):
 
     def add_schedule_grid(self):
         """
-        Setup the table to display the shift information
+        Fill the table model with the employee's own published shifts, or the whole team's
         """     
 
-        if self.parent_stack.current_user == None:
-            self.schedule_table = QTableWidget(self)
-            scroll_area = QScrollArea(self)
-            people_names = ['placeholder']
-            self.target_cells = {(1,1)}
-            self.shift_grid = [[1], [2]]
-            
-        else: 
-            people_names = []
-            self.shift_grid = []
-
-            business_id = Database_Controller.find_employee(self.parent_stack.current_user)[1]
-            names = Database_Controller.get_employees(business_id)
-            people_names = [str(names[i]) for i in range(len(names))]
+        if self.team_view:
+            self.fill_schedule_grid(self.schedule_model)
+        else:
+            self.fill_own_schedule()
 
-            day_of_week = date.today().isoweekday()
-            monday_this_week = date.today() - timedelta(days=(day_of_week - 1))
-            week_dates = [(monday_this_week + timedelta(days=i)).strftime("%d-%m-20%y") for i in range(7)]
 
-            for name in names:
-                firstname,lastname = str(name).split(" ")
-                self.shift_grid.append([Database_Controller.find_employee_id(firstname, lastname)[0], [()]*7])
+    def fill_own_schedule(self):
+        """
+        Fill a single row grid with only the current employee's published shifts for the week being viewed
+        """
 
-            one_time_shifts = []
+        employee_id = self.parent_stack.current_user
+        if employee_id == None:
+            return
 
-            for day in week_dates:
-                shifts = Database_Controller.get_assigned_shifts(int(business_id), str(day))
+        monday = self.week_start()
+        published_shifts = self.load_week("own schedule", self.load_own_week, employee_id, monday)
 
-                for index, shift in enumerate(shifts):
+        if self.own_name is None or self.own_name[0] != employee_id:
+            name = Database_Controller.find_employee_fields(employee_id, "first_name", "last_name")
+            self.own_name = (employee_id, f"{name['first_name']} {name['last_name']}")
 
-                    days,month,year = day.split("-")
-                    weekday = date(int(year),int(month),int(days)).isoweekday()
-                    list_for_shift = list(shifts[index])
-                    list_for_shift.append(weekday-1)
-                    one_time_shifts.append(list_for_shift)
+        self.shift_grid = [[employee_id, [()]*7]]
+        self.shifts = []
+        self.employee_rows = {employee_id: 0}
+        self.day_columns = {day: column for days in (self.week_dates(monday), DAYS_OF_WEEK) for column, day in enumerate(days)}
+        self.assignment_cells = {}
+        cells = {}
 
-            recurring_shifts = []
+        for shift_id, shift_date, start_time, end_time in published_shifts:
+            column = self.day_columns[shift_date]
+            self.shift_grid[0][1][column] = shift_id
+            self.shifts.append([employee_id, shift_id, column])
+            self.assignment_cells[(employee_id, shift_id)] = (0, column, (start_time, end_time))
+            cells[(0, column)] = self.shift_cell((employee_id, shift_id), (start_time, end_time), 4)
 
-            for index, name in enumerate(DAYS_OF_WEEK):
-                shifts = Database_Controller.get_assigned_shifts(int(business_id), str(name))
+        self.schedule_model.set_week([self.own_name[1]], self.week_labels(monday), cells)
+        self.prefetch_weeks("own schedule", self.load_own_week, employee_id)
 
-                for ind in range(len(shifts)):
 
-                    days,month,year = week_dates[index].split("-")
-                    weekday = date(int(year),int(month),int(days)).isoweekday()
-                    list_for_shift = list(shifts[ind])
-                    list_for_shift.append(weekday-1)
-                    recurring_shifts.append(list_for_shift)
+    def load_own_week(self, employee_id, monday):
+        """
+        Load an employee's published shifts for a week
+        """
 
-            self.shifts = one_time_shifts + recurring_shifts
+        return Database_Controller.get_published_shifts(employee_id, self.week_dates(monday) + DAYS_OF_WEEK)
 
-            for day in range(7):
-                for index, employee in enumerate(self.shift_grid):
-                    for shift in self.shifts:
-                        if employee[0] == shift[0]:
-                            self.shift_grid[index][1][shift[2]] = shift[1]
 
-            self.target_cells = set()
+    def toggle_team_view(self):
+        """
+        Switch between the employee's own shifts and the whole team's published shifts
+        """
 
-            for shift in range(len(self.shifts)):
-                employee_details = Database_Controller.find_employee(self.shifts[shift][0])
-                employee_name = f"{employee_details[2]} {employee_details[3]}"
-                self.target_cells.add((people_names.index(employee_name), self.shifts[shift][2]))
+        self.team_view = not self.team_view
+        self.team_view_button.setText("My Shifts" if self.team_view else "Team View")
+        self.refresh()
 
-        try:
-            header_font = QFont("Cascadia Mono", 12, QFont.Bold)
 
-            self.schedule_table.setRowCount(len(people_names))
-            self.schedule_table.setVerticalHeaderLabels(people_names)
-            self.schedule_table.verticalHeader().setFont(header_font)
-            self.schedule_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+    def shift_cell(self, payload, times, status):
+        """
+        Create the grid cell showing the times of a shift once it has been published
+        """
 
-            for row in range(self.schedule_table.rowCount()):
-                self.schedule_table.setRowHeight(row, 100)
+        if status == 4:
+            return {"text": f"{times[0]} - {times[1]}", "colour": "#333333", "text_colour": "white", "status": status, "payload": payload}
 
-            self.schedule_table.setColumnCount(7)
-            self.schedule_table.setHorizontalHeaderLabels(DAYS_OF_WEEK)
-            self.schedule_table.horizontalHeader().setFont(header_font)
-            self.schedule_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        return {"status": status, "payload": payload}
 
-            self.schedule_table.setStyleSheet(self.TIMETABLE_GRID_STYLE)
 
-            shift_data = Add_Assigned_Shift_Data_Employee(self.target_cells, self.shift_grid)
-            self.schedule_table.setItemDelegate(shift_data)
-        
-            self.schedule_table.setSelectionMode(QAbstractItemView.SingleSelection)
-            self.schedule_table.setSelectionBehavior(QAbstractItemView.SelectItems)
+    def data_changed(self, event):
+        """
+        Patch the cell of a changed assignment, ignore other employees' changes to their own shifts, or rebuild the grid
+        """
 
-            for row in range(self.schedule_table.rowCount()):
-                for col in range(self.schedule_table.columnCount()):
-                    item = self.schedule_table.item(row, col)
-                    if item is None:
-                        item = QTableWidgetItem()
-                        self.schedule_table.setItem(row, col, item)
-                    item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
+        if isinstance(event, Change_Bus.Employee_Updated) and event.employee_id == self.parent_stack.current_user:
+            self.own_name = None
 
-            scroll_area.setWidget(self.schedule_table)
-            scroll_area.setWidgetResizable(True)
+        if self.team_view:
+            if self.patch_schedule_grid(self.schedule_model, event):
+                return
 
-            scroll_area.setMinimumSize(1500, 750)
+        elif isinstance(event, (Change_Bus.Shift_Assigned, Change_Bus.Shift_Unassigned, Change_Bus.Shift_Published)) and event.employee_id != self.parent_stack.current_user and self.is_current_before_change():
+            self.mark_current()
+            return
 
-        except UnboundLocalError:
-            pass
+        super().data_changed(event)
         
 
     def refresh(self):
@@ -1477,7 +2198,9 @@ class Employee_MainPage(Page):
         Log the user out and return to the start page
         """
 
+        Session_Manager.end_session(self.parent_stack.current_user)
         self.parent_stack.current_user = None
+        self.parent_stack.session_token = None
         self.parent_stack.load_page("Start Page")
 
 
@@ -1534,17 +2257,26 @@ class Reset_Password(Page):
                 self.inputs[0].input_field.clear()
                 self.inputs[1].input_field.clear()
                 self.inputs[2].input_field.clear()
-                current_password = Database_Controller.find_employee(self.parent_stack.current_user)[-1]
-                is_matching = Password_Hasher.verify_password(entered_current_password, current_password)
-                if is_matching and str(new_password) == str(confirm_new_password):
-                    Database_Controller.update_password(str(new_password), self.parent_stack.current_user)
-                    self.parent_stack.load_page("Employees Main Page")
+
+                if str(new_password) == str(confirm_new_password):
+                    self.run_while_busy("Changing password...", self.password_changed, Database_Controller.change_password, entered_current_password, new_password, self.parent_stack.current_user)
                 else:
                     Insufficient_details()
         except:
             Insufficient_details()
 
 
+    def password_changed(self, is_matching):
+        """
+        Return to the main page if the current password was correct and the new one has been saved
+        """
+
+        if is_matching:
+            self.parent_stack.load_page("Employees Main Page")
+        else:
+            Insufficient_details()
+
+
 class Request_Time_Off(Page):
     """
     Page that allows users to request time off
@@ -1721,9 +2453,8 @@ class View_Assigned_Shift_Details(Page):
         """
 
         shift_id = self.parent_stack.current_shift
-        firstname, lastname, position_id =  Database_Controller.get_employee_on_shift(self.parent_stack.current_shift)
-        id = Database_Controller.find_employee_id(firstname, lastname)
-        Database_Controller.remove_employee_from_shift(int(id[0]), int(shift_id))
+        employee_id, firstname, lastname, position_id =  Database_Controller.get_employee_on_shift(self.parent_stack.current_shift)
+        Database_Controller.remove_employee_from_shift(int(employee_id), int(shift_id))
         self.parent_stack.load_page("Managers Main Page")
 
 
@@ -1736,7 +2467,7 @@ class View_Assigned_Shift_Details(Page):
         start_time = times[0]
         end_time = times[1]
         cal_date = times[2]
-        firstname, lastname, position_id =  Database_Controller.get_employee_on_shift(self.parent_stack.current_shift)
+        employee_id, firstname, lastname, position_id =  Database_Controller.get_employee_on_shift(self.parent_stack.current_shift)
 
         position = Database_Controller.find_position(position_id)
 
@@ -1824,7 +2555,7 @@ class Create_Employee(Page):
         """
 
         if self.parent_stack.current_user:
-            self.business_id = Database_Controller.find_employee(self.parent_stack.current_user)[1]
+            self.business_id = Database_Controller.find_employee_business(self.parent_stack.current_user)
             positions = Database_Controller.get_positions(self.business_id)
             self.position_dropdown.clear()
             self.position_dropdown.addItems(positions)
@@ -1867,14 +2598,21 @@ class Create_Employee(Page):
 
             else:
                 position_id = Database_Controller.find_position_id(self.selected_position, self.business_id)
-                Database_Controller.add_employee(self.business_id, first_name, last_name, None, None, position_id, None, None, None, None, '1234')
-                self.parent_stack.editing_user = Database_Controller.find_new_employee()
-                self.parent_stack.load_page("Initialise Employee Details")
+                self.run_while_busy("Adding employee...", self.employee_added, Database_Controller.add_employee, self.business_id, first_name, last_name, None, None, position_id, None, None, None, None, '1234')
 
         except:
             Insufficient_details()
 
 
+    def employee_added(self, result):
+        """
+        Load the details page for the employee once they have been added in the background
+        """
+
+        self.parent_stack.editing_user = Database_Controller.find_new_employee()
+        self.parent_stack.load_page("Initialise Employee Details")
+
+
 class Create_Position(Page):
     """
     Adds a job position to the business
@@ -1922,7 +2660,7 @@ class Create_Position(Page):
             title = self.inputs[0].input_field.text()
             description = self.inputs[1].input_field.toPlainText()
             if title != "":
-                business_id = Database_Controller.find_employee(self.parent_stack.current_user)[1]
+                business_id = Database_Controller.find_employee_business(self.parent_stack.current_user)
                 Database_Controller.add_position(business_id, title, description)
                 self.inputs[0].input_field.clear()
                 self.inputs[1].input_field.clear()
@@ -1940,6 +2678,8 @@ class Manage_Shifts(Page):
     The page to view and manage shifts
     """
 
+    REFRESH_ON_DATA_CHANGE = True
+
     def __init__(self, parent_stack):
         """
         Run the methods that setup the header and the tables
@@ -1952,7 +2692,10 @@ class Manage_Shifts(Page):
         self.layout = QVBoxLayout(self)
         self.setLayout(self.layout)
 
-        self.target_cells = set()
+        self.shifts = []
+        self.shifts_model, self.shifts_table, self.shift_scroll_area = self.create_grid(Grid_Cell_Delegate(self))
+        self.shifts_table.clicked.connect(self.shift_clicked)
+
         self.add_shift_grid()
         self.add_header()
 
@@ -1979,6 +2722,8 @@ class Manage_Shifts(Page):
         ]
         
         header_layout.addWidget(back_button)
+        for button in self.create_week_buttons():
+            header_layout.addWidget(button)
         header_layout.addSpacing(2400)
 
         for button in shift_buttons:
@@ -1988,86 +2733,81 @@ class Manage_Shifts(Page):
 
     def add_shift_grid(self):
         """
-        Setup the table to display the shift information
+        Fill the table model with the shift information
         """
 
         if self.parent_stack.current_user is None:
-            self.shifts_table = QTableWidget(self)
-            self.shift_scroll_area = QScrollArea(self)
-            left_side = ['placeholder']
-        else:
-            one_time_shifts = []
-            recurring_shifts = []
-            most_shifts = 0
+            return
 
-            business_id = Database_Controller.find_employee(self.parent_stack.current_user)[1]
+        most_shifts = 0
 
-            day_of_week = date.today().isoweekday()
-            monday_this_week = date.today() - timedelta(days=(day_of_week - 1))
-            week_dates = [monday_this_week + timedelta(days=i) for i in range(7)]
+        business_id = Database_Controller.find_employee_business(self.parent_stack.current_user)
+        monday = self.week_start()
+        self.shifts, positions, staffing = self.load_week("shifts", self.load_shift_week, business_id, monday)
 
-            for day in DAYS_OF_WEEK:
-                recurring_shifts.append(Database_Controller.get_shifts(business_id, day))
+        for i in range(0, 7):
+            if len(self.shifts[i]) > most_shifts:
+                most_shifts = len(self.shifts[i])
 
-            for day in week_dates:
-                date_of_day = day.strftime('%d-%m-20%y')
-                one_time_shifts.append(Database_Controller.get_shifts(business_id, date_of_day))
-            
-            self.shifts = [a + b for a, b in zip(recurring_shifts, one_time_shifts)]
+        left_side = [str(i) for i in range(1, most_shifts + 1)]
 
-            for i in range(0, 7):
-                if len(self.shifts[i]) > most_shifts:
-                    most_shifts = len(self.shifts[i])
+        cells = {}
+        for day_num, day in enumerate(self.shifts):
+            for shift_num, shift in enumerate(day):
+                cells[(shift_num, day_num)] = self.shift_cell(shift, positions, staffing[shift[0]])
 
-            left_side = [str(i) for i in range(1, most_shifts + 1)]
+        self.shifts_model.set_week(left_side, self.week_labels(monday), cells)
+        self.prefetch_weeks("shifts", self.load_shift_week, business_id)
 
-        
-        try:
-            self.shifts_table.setRowCount(most_shifts)
-            self.shifts_table.setVerticalHeaderLabels(left_side)
-            self.shifts_table.verticalHeader().setFont(QFont("Cascadia Mono", 12, QFont.Bold))
-            self.shifts_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
 
-            for row in range(self.shifts_table.rowCount()):
-                self.shifts_table.setRowHeight(row, 100)
-    
-            self.shifts_table.setColumnCount(7)
-            self.shifts_table.setHorizontalHeaderLabels(DAYS_OF_WEEK)
-            self.shifts_table.horizontalHeader().setFont(QFont("Cascadia Mono", 12, QFont.Bold))
-            self.shifts_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-            
-            self.shifts_table.setSelectionMode(QAbstractItemView.SingleSelection)
-            self.shifts_table.setSelectionBehavior(QAbstractItemView.SelectItems)
-            self.shifts_table.setStyleSheet(self.TIMETABLE_GRID_STYLE)
-            
-            self.target_cells = set()
-            for day_num, day in enumerate(self.shifts):
-                for shift_num, shift in enumerate(day):
-                    self.target_cells.add((shift_num, day_num))
+    def load_shift_week(self, business_id, monday):
+        """
+        Load the recurring and one-time shifts of a week along with their positions and staffing
+        """
 
-            shift_data = Add_Empty_Shift_Data(self.target_cells, self.shifts)
-            self.shifts_table.setItemDelegate(shift_data)
+        recurring_shifts = []
+        one_time_shifts = []
 
-            self.shift_scroll_area.setWidget(self.shifts_table)
-            self.shift_scroll_area.setWidgetResizable(True)
-            self.shift_scroll_area.setMinimumSize(1500, 750)
+        for day in DAYS_OF_WEEK:
+            recurring_shifts.append(Database_Controller.get_shifts(business_id, day))
 
-            self.shifts_table.cellClicked.disconnect()
-            self.shifts_table.cellClicked.connect(self.shift_clicked)
+        for day in self.week_dates(monday):
+            one_time_shifts.append(Database_Controller.get_shifts(business_id, day))
 
-        except:
-            pass
+        shifts = [a + b for a, b in zip(recurring_shifts, one_time_shifts)]
+        positions = Database_Controller.get_position_names(business_id)
+        staffing = Database_Controller.find_shift_staffing(shift[0] for day in shifts for shift in day)
+
+        return shifts, positions, staffing
+
+
+    def shift_cell(self, shift, positions, employees_on):
+        """
+        Create the grid cell showing a shift's times, position and whether it is fully staffed
+        """
+
+        start_time, end_time, employees_needed = shift[2], shift[3], shift[5]
+        position = positions.get(shift[6], "")
+        colour = "#222222" if int(employees_needed) <= int(employees_on) else "#333333"
 
+        if employees_needed == 1:
+            text = f"{start_time} - {end_time} \n {employees_needed} {position}"
+        else:
+            text = f"{start_time} - {end_time} \n {employees_needed} {position}s"
+
+        return {"text": text, "colour": colour, "text_colour": "white", "status": (int(employees_on), int(employees_needed)), "payload": shift}
 
-    def shift_clicked(self, row, column):
+
+    def shift_clicked(self, index):
         """
         Opens shift details when a shift is clicked
         """
 
-        if (row, column) in self.target_cells:
-            self.parent_stack.current_shift = self.shifts[column][row]
+        shift = index.data(PAYLOAD_ROLE)
+        if shift is not None:
+            self.parent_stack.current_shift = shift
             self.parent_stack.load_page("Empty Shift Details")
-        self.refresh()
+        self.request_refresh()
 
 
     def refresh(self):
@@ -2075,13 +2815,8 @@ class Manage_Shifts(Page):
         Refresh the grid to ensure the data remains correct
         """
 
-        self.target_cells.clear()
-        self.shifts_table.clearContents()
-
         self.add_shift_grid()
 
-        self.shifts_table.blockSignals(False)
-
 
     def create_one_time_shift(self):
         """
@@ -2104,11 +2839,8 @@ class Manage_Shifts(Page):
         Clears the database of all shifts created in a week
         """
 
-        for day in self.shifts:
-            for shift in day:
-                shift_id = shift[0]
-                Database_Controller.delete_shift(shift_id)
-        self.refresh()
+        Database_Controller.delete_shifts(shift[0] for day in self.shifts for shift in day)
+        self.request_refresh()
 
 
     def go_back(self):
@@ -2124,6 +2856,8 @@ class Manage_Employees(Page):
     Page that allows managers to manage the employees    
     """
 
+    REFRESH_ON_DATA_CHANGE = True
+
     def __init__(self, parent_stack):
         """
         Run the methods that setup the header and the tables
@@ -2136,7 +2870,10 @@ class Manage_Employees(Page):
         self.layout = QVBoxLayout(self)
         self.setLayout(self.layout)
 
-        self.target_cells = set()
+        self.time_off_entries = []
+        self.time_off_model, self.time_off_table, self.time_off_scroll_area = self.create_grid(Grid_Cell_Delegate(self), QHeaderView.Fixed, 150)
+        self.time_off_table.clicked.connect(self.request_clicked)
+
         self.add_shift_grid()
         self.add_header()
 
@@ -2159,10 +2896,12 @@ class Manage_Employees(Page):
         time_off_title.setFont(self.LABEL_FONT)
 
         add_employee_button = self.create_button("Add Employee", 200, QFont('Cascadia Mono', 12), self.add_employee, height = 50)
+        import_employees_button = self.create_button("Import Employees", 200, QFont('Cascadia Mono', 12), self.import_employees, height = 50)
+        reset_passwords_button = self.create_button("Reset Passwords", 200, QFont('Cascadia Mono', 12), self.reset_passwords, height = 50)
         add_position_button = self.create_button("Add Position", 140, QFont('Cascadia Mono', 12), self.add_position, height = 50)
         back_button = self.create_button("Back", self.BACK_BUTTON_WIDTH, self.BUTTON_FONT, self.go_back)
 
-        left_buttons = [add_employee_button, add_position_button]
+        left_buttons = [add_employee_button, import_employees_button, reset_passwords_button, add_position_button]
         header_layout.addWidget(back_button)
         header_layout.addSpacing(20)
         header_layout.addWidget(time_off_title)
@@ -2175,96 +2914,72 @@ class Manage_Employees(Page):
 
     def add_shift_grid(self):
         """
-        Setup the table to display the shift information
+        Fill the table model with the time-off requests of each employee
         """
 
         if self.parent_stack.current_user is None:
-            self.time_off_table = QTableWidget(self)
-            self.time_off_scroll_area = QScrollArea(self)
-            self.time_off_entries = [(1,1),(1,1)]
-            people_names = ['placeholder']
-            top = []
-        else:
-            people_names = []
+            return
 
-            business_id = Database_Controller.find_employee(self.parent_stack.current_user)[1]
-            names = Database_Controller.get_employees(business_id)
-            people_names = [str(names[i]) for i in range(len(names))]
+        business_id = Database_Controller.find_employee_business(self.parent_stack.current_user)
+        roster = Database_Controller.get_roster(business_id)
+        people_names = [str(employee[1]) for employee in roster]
 
-            most_requests = 0
+        day_of_week = date.today().isoweekday()
+        monday_this_week = date.today() - timedelta(days=(day_of_week - 1))
 
-            business_id = Database_Controller.find_employee(self.parent_stack.current_user)[1]
+        self.time_off_entries = Database_Controller.get_time_off_info(business_id, str(monday_this_week))
 
-            day_of_week = date.today().isoweekday()
-            monday_this_week = date.today() - timedelta(days=(day_of_week - 1))
+        max_entries = 0
+        cells = {}
+        for employee_id, employee in enumerate(self.time_off_entries):
+            for index, entry in enumerate(employee):
+                max_entries = max(max_entries, index + 1)
+                cells[(employee_id, index)] = self.time_off_cell(entry)
 
-            self.time_off_entries = Database_Controller.get_time_off_info(business_id, str(monday_this_week))
+        top = [str(i) for i in range(1, max_entries + 1)]
 
-            top = [str(i) for i in range(1, most_requests + 1)]
-    
-        try:
-            self.time_off_table.setRowCount(len(people_names))
-            self.time_off_table.setVerticalHeaderLabels(people_names)
-            self.time_off_table.verticalHeader().setFont(QFont("Cascadia Mono", 12, QFont.Bold))
-            self.time_off_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
-
-            for row in range(self.time_off_table.rowCount()):
-                self.time_off_table.setRowHeight(row, 100)
-
-            max_entries = 0
-            for employee_id, employee in enumerate(self.time_off_entries):
-                for index,entry in enumerate(employee):
-                    if index+1 > max_entries:
-                        max_entries = index+1
-                
-            self.time_off_table.setColumnCount(max_entries)
-            self.time_off_table.setHorizontalHeaderLabels(top)
-            self.time_off_table.horizontalHeader().setFont(QFont("Cascadia Mono", 12, QFont.Bold))
-            self.time_off_table.horizontalHeader().setSectionResizeMode(QHeaderView.Fixed)
-
-            for column in range(self.time_off_table.columnCount()):
-                self.time_off_table.setColumnWidth(column,150)
-            
-            self.time_off_table.setSelectionMode(QAbstractItemView.SingleSelection)
-            self.time_off_table.setSelectionBehavior(QAbstractItemView.SelectItems)
-            self.time_off_table.setStyleSheet(self.TIMETABLE_GRID_STYLE)
-            
-            self.target_cells = set()
-            for employee_id, employee in enumerate(self.time_off_entries):
-                for index,entry in enumerate(employee):
-                    self.target_cells.add((employee_id, index))
-
-            time_requests_data = Add_Time_Off_Data(self.target_cells, self.time_off_entries)
-            self.time_off_table.setItemDelegate(time_requests_data)
-
-            for row in range(self.time_off_table.rowCount()):
-                for col in range(self.time_off_table.columnCount()):
-                    item = self.time_off_table.item(row, col)
-                    if item is None:
-                        item = QTableWidgetItem()
-                        self.time_off_table.setItem(row, col, item)
-                    item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
-
-            self.time_off_scroll_area.setWidget(self.time_off_table)
-            self.time_off_scroll_area.setWidgetResizable(True)
-            self.time_off_scroll_area.setMinimumSize(1500, 750)
-
-            self.time_off_table.cellClicked.disconnect()
-            self.time_off_table.cellClicked.connect(self.request_clicked)
-
-        except TypeError:
-            pass
+        self.time_off_model.set_week(people_names, top, cells)
 
 
-    def request_clicked(self, row, column):
+    def time_off_cell(self, entry):
+        """
+        Create the grid cell showing a time-off request and its status
+        """
+
+        start_date, end_date, status_id = entry[2], entry[3], entry[-2]
+        title, colour, text_colour = TIME_OFF_STYLES.get(status_id, TIME_OFF_STYLES[1])
+
+        return {"text": f"{title}: \n{start_date}\n-\n{end_date}", "colour": colour, "text_colour": text_colour, "status": status_id, "payload": entry}
+
+
+    def data_changed(self, event):
+        """
+        Recolour the cell of a time-off request whose status changed, or rebuild the grid for any other change
+        """
+
+        if isinstance(event, Change_Bus.Time_Off_Status_Changed) and self.is_current_before_change():
+            for (row, column), cell in list(self.time_off_model.cells.items()):
+                entry = cell["payload"]
+                if entry[0] == int(event.time_id):
+                    entry = entry[:6] + (event.status_id,) + entry[7:]
+                    self.time_off_model.update_cell(row, column, self.time_off_cell(entry))
+
+            self.mark_current()
+            return
+
+        super().data_changed(event)
+
+
+    def request_clicked(self, index):
         """
         Opens shift details when a shift is clicked
         """
 
-        if (row, column) in self.target_cells:
-            self.parent_stack.current_request = self.time_off_entries[row][column]
+        request = index.data(PAYLOAD_ROLE)
+        if request is not None:
+            self.parent_stack.current_request = request
             self.parent_stack.load_page("Timeoff Request Details")
-        self.refresh()
+        self.request_refresh()
 
 
     def refresh(self):
@@ -2272,13 +2987,8 @@ class Manage_Employees(Page):
         Refresh the grid to ensure the data remains correct
         """
 
-        self.target_cells.clear()
-        self.time_off_table.clearContents()
-
         self.add_shift_grid()
 
-        self.time_off_table.blockSignals(False)
-
 
     def go_back(self):
         """
@@ -2303,6 +3013,76 @@ class Manage_Employees(Page):
 
         self.parent_stack.load_page("Create Position")
 
+
+    def import_employees(self):
+        """
+        Add every employee listed in a CSV file in one go, hashing their passwords in the background
+        """
+
+        file_path, _ = QFileDialog.getOpenFileName(self, "Choose Employee List", "", "CSV Files (*.csv);;All Files (*)")
+        if not file_path:
+            return
+
+        business_id = Database_Controller.find_employee_business(self.parent_stack.current_user)
+
+        try:
+            employees = self.read_employee_list(file_path, business_id)
+        except (OSError, KeyError, TypeError, ValueError):
+            Insufficient_details()
+            return
+
+        self.run_while_busy("Importing employees...", self.employees_imported, Database_Controller.add_employees, business_id, employees)
+
+
+    def read_employee_list(self, file_path, business_id):
+        """
+        Read the employees from a CSV file with first_name, last_name and position columns, and optionally
+        email, phone_number, hourly_rate, minimum_hours, maximum_hours and password columns
+        """
+
+        employees = []
+        with open(file_path, newline="") as file:
+            for row in csv.DictReader(file):
+                first_name, last_name = row["first_name"].strip(), row["last_name"].strip()
+                position_id = Database_Controller.find_position_id(row["position"].strip(), business_id)
+                if " " in first_name or " " in last_name or first_name == "" or last_name == "" or position_id is None:
+                    raise ValueError(f"Cannot import {first_name} {last_name}")
+
+                details = [row.get(field) or None for field in ("email", "phone_number", "hourly_rate")]
+                if not Database_Controller.valid_contact_details(*details[:2]):
+                    raise ValueError(f"Cannot import {first_name} {last_name}")
+
+                hours = [row.get(field) or None for field in ("minimum_hours", "maximum_hours")]
+                employees.append((first_name, last_name, *details[:2], position_id, details[2], None, *hours, row.get("password") or '1234'))
+
+        return employees
+
+
+    def employees_imported(self, result):
+        """
+        Report how many employees were imported and refresh the grid
+        """
+
+        Bulk_Update_Finished("imported", result)
+        self.request_refresh()
+
+
+    def reset_passwords(self):
+        """
+        Give every other employee in the business the standard password in one go, hashing them in the background
+        """
+
+        if not self.require_session(Session_Manager.MANAGER, self.reset_passwords):
+            return
+
+        business_id = Database_Controller.find_employee_business(self.parent_stack.current_user)
+        employee_ids = [employee[0] for employee in Database_Controller.get_roster(business_id) if employee[0] != self.parent_stack.current_user]
+
+        if employee_ids == [] or not Confirm_Reset_Passwords(len(employee_ids)).accepted:
+            return
+
+        self.run_while_busy("Resetting passwords...", lambda result: Bulk_Update_Finished("had their password reset", result), Database_Controller.update_passwords, dict.fromkeys(employee_ids, '1234'))
+
         
 class Create_OneTime_Shift(Page):
     """
@@ -2403,7 +3183,7 @@ class Create_OneTime_Shift(Page):
         """
 
         if self.parent_stack.current_user:
-            self.business_id = Database_Controller.find_employee(self.parent_stack.current_user)[1]
+            self.business_id = Database_Controller.find_employee_business(self.parent_stack.current_user)
             positions = Database_Controller.get_positions(self.business_id)
             self.position_dropdown.clear()
             self.position_dropdown.addItems(positions)
@@ -2436,7 +3216,7 @@ class Create_OneTime_Shift(Page):
             start_time = self.start_time_selector.time().toString('HH.mm')
             end_time = self.end_time_selector.time().toString('HH.mm')
             if float(start_time) < float(end_time):
-                business_id = Database_Controller.find_employee(self.parent_stack.current_user)[1]
+                business_id = Database_Controller.find_employee_business(self.parent_stack.current_user)
                 position = Database_Controller.find_position_id(selected_position, business_id)
 
                 Database_Controller.add_shift(business_id, position, num_employees, shift_date, start_time, end_time)
@@ -2564,7 +3344,7 @@ class Create_Recurring_Shift(Page):
         """
 
         if self.parent_stack.current_user:
-            self.business_id = Database_Controller.find_employee(self.parent_stack.current_user)[1]
+            self.business_id = Database_Controller.find_employee_business(self.parent_stack.current_user)
             positions = Database_Controller.get_positions(self.business_id)
             self.position_dropdown.clear()
             self.position_dropdown.addItems(positions)
@@ -2605,7 +3385,7 @@ class Create_Recurring_Shift(Page):
             start_time = self.start_time_selector.time().toString('HH.mm')
             end_time = self.end_time_selector.time().toString('HH.mm')
             if float(start_time) < float(end_time):
-                business_id = Database_Controller.find_employee(self.parent_stack.current_user)[1]
+                business_id = Database_Controller.find_employee_business(self.parent_stack.current_user)
                 position = Database_Controller.find_position_id(selected_position, business_id)
                 Database_Controller.add_shift(business_id, position, num_employees, selected_day, start_time, end_time)
                 self.number_of_employees.input_field.clear()
@@ -2709,12 +3489,11 @@ class View_Timeoff_Request_Details(Page):
         end_time = self.parent_stack.current_request[5]
         end_date = self.parent_stack.current_request[3]
         employee = self.parent_stack.current_request[1]
-        firstname, lastname = Database_Controller.find_employee(employee)[2],Database_Controller.find_employee(employee)[3]
+        firstname, lastname, position_id = Database_Controller.find_employee_fields(employee, "first_name", "last_name", "position_id")
         current_status_id = self.parent_stack.current_request[6]
         status = Database_Controller.find_status_name(current_status_id)
         notes = self.parent_stack.current_request[7]
 
-        position_id = Database_Controller.find_employee(employee)[6]
         position = Database_Controller.find_position(position_id)
 
         startday,startmonth,startyear = str(start_date).split("-")
@@ -2903,8 +3682,11 @@ class Assign_Shift(Page):
         Handle the submit button being clicked
         """
 
-        first, last = self.selected_employee.split(" ")
-        employee_id = Database_Controller.find_employee_id(first, last)[0]
+        employee_id = self.selected_employee
+        if employee_id is None:
+            Insufficient_details()
+            return
+
         shift_id = self.parent_stack.current_shift[0]
 
         Database_Controller.assign_shift(employee_id, shift_id, 1)
@@ -2916,7 +3698,7 @@ class Assign_Shift(Page):
         Update the attribute to the contents of the dropdown option selected.
         """
 
-        self.selected_employee = self.employee_dropdown.itemText(index)
+        self.selected_employee = self.employee_dropdown.itemData(index)
 
 
     def load_employees(self):
@@ -2930,20 +3712,19 @@ class Assign_Shift(Page):
             end_time = self.parent_stack.current_shift[3]
             cal_date = self.parent_stack.current_shift[4]
             position_id = self.parent_stack.current_shift[6]
-            business_id = Database_Controller.find_employee(self.parent_stack.current_user)[1]
-            names = []
+            business_id = Database_Controller.find_employee_business(self.parent_stack.current_user)
+            names = {employee[0]: employee[1] for employee in Database_Controller.get_roster(business_id)}
+
+            self.employee_dropdown.clear()
 
             employee_ids = Database_Controller.get_available_employees(business_id, position_id, cal_date, start_time, end_time)
             for id in employee_ids:
                 on_shift = Database_Controller.find_if_employee_available(id, self.parent_stack.current_shift[0] )
                 if on_shift == True:
-                    employee = Database_Controller.find_employee(id)
-                    names.append(f"{employee[2]} {employee[3]}")
+                    self.employee_dropdown.addItem(names[id], id)
                 else:
                     pass
 
-            self.employee_dropdown.clear()
-            self.employee_dropdown.addItems(names)
             return True
 
 
@@ -2983,183 +3764,185 @@ class Assign_Shift(Page):
             self.employee.setText(f"{employees} {position}s needed")
 
 
-class Add_Empty_Shift_Data(QStyledItemDelegate):
+class Week_Grid_Model(QAbstractTableModel):
     """
-    Fill out the shifts grid with all shift data
+    Holds the cells of a schedule grid so that views only read the cells they show.
+    Rows are handed to the view in batches as it scrolls so large rosters do not have to be laid out at once.
     """
 
-    def __init__(self, target_cells, shifts, parent=None):
+    FETCH_BATCH_SIZE = 200
+
+    def __init__(self, parent=None):
         """
-        Setup target cells and shift data
+        Setup an empty grid
         """
 
         super().__init__(parent)
 
-        self.target_cells = target_cells
-        self.shifts = shifts
+        self.row_labels = []
+        self.column_labels = []
+        self.cells = {}
+        self.loaded_rows = 0
 
 
-    def paint(self, painter, option, index):
+    def rowCount(self, parent=QModelIndex()):
         """
-        Fill cells with correct information
+        Return the number of rows the view has loaded so far
         """
 
-        row, column = index.row(), index.column()
-        if (row, column) in self.target_cells:
+        return 0 if parent.isValid() else self.loaded_rows
 
-            shift = self.shifts[column][row]
-            start_time = shift[2]
-            end_time = shift[3]
-            employees_needed = shift[5]
-            position = Database_Controller.find_position(shift[6])
-            employees_on = Database_Controller.find_num_of_employees_working(shift[0])
-            if int(employees_needed) <= int(employees_on):
-                painter.fillRect(option.rect, QColor("#222222"))
-                painter.setPen(Qt.white)
-                painter.setFont(QFont("Cascadia Mono", 12, QFont.Bold))
 
-                if employees_needed == 1:
-                    painter.drawText(option.rect, Qt.AlignCenter, f"{start_time} - {end_time} \n {employees_needed} {position}")
+    def canFetchMore(self, parent=QModelIndex()):
+        """
+        Tell the view whether there are more rows to load as it scrolls
+        """
 
-                else:
-                    painter.drawText(option.rect, Qt.AlignCenter, f"{start_time} - {end_time} \n {employees_needed} {position}s")
-            else:
-                painter.fillRect(option.rect, QColor("#333333"))
-                painter.setPen(Qt.white)
-                painter.setFont(QFont("Cascadia Mono", 12, QFont.Bold))
+        return not parent.isValid() and self.loaded_rows < len(self.row_labels)
 
-                if employees_needed == 1:
-                    painter.drawText(option.rect, Qt.AlignCenter, f"{start_time} - {end_time} \n {employees_needed} {position}")
 
-                else:
-                    painter.drawText(option.rect, Qt.AlignCenter, f"{start_time} - {end_time} \n {employees_needed} {position}s")
+    def fetchMore(self, parent=QModelIndex()):
+        """
+        Load the next batch of rows into the view
+        """
 
-        else:
-            super().paint(painter, option, index)
+        if parent.isValid():
+            return
+
+        new_rows = min(self.FETCH_BATCH_SIZE, len(self.row_labels) - self.loaded_rows)
+        if new_rows <= 0:
+            return
 
+        self.beginInsertRows(QModelIndex(), self.loaded_rows, self.loaded_rows + new_rows - 1)
+        self.loaded_rows += new_rows
+        self.endInsertRows()
 
-class Add_Assigned_Shift_Data_Manager(QStyledItemDelegate):
-    """
-    Fill out the employee-shifts grid with all shift times
-    """
 
-    def __init__(self, target_cells, shifts, parent=None):
+    def columnCount(self, parent=QModelIndex()):
         """
-        Setup target cells and shift data
+        Return the number of columns in the grid
         """
 
-        super().__init__(parent)
-        self.target_cells = target_cells
-        self.shifts = shifts  
+        return 0 if parent.isValid() else len(self.column_labels)
 
 
-    def paint(self, painter, option, index):
+    def data(self, index, role=Qt.DisplayRole):
         """
-        Fill cells with correct information
+        Return the text, colour, status or stored data of a cell
         """
 
-        row, column = index.row(), index.column()
-        if (row, column) in self.target_cells:
-            shift_id = self.shifts[row][-1][column]
-            time = Database_Controller.get_shift_times(shift_id)
-            status = Database_Controller.get_shift_status(self.shifts[row][0], shift_id)
+        cell = self.cells.get((index.row(), index.column()))
+        if cell is None:
+            return None
 
-            painter.fillRect(option.rect, QColor("#333333"))
-            painter.setPen(Qt.white)
-            painter.setFont(QFont("Cascadia Mono", 12, QFont.Bold))
-            if status == 1:
-                painter.drawText(option.rect, Qt.AlignCenter, f"Pending Publish: \n{time[0]} - {time[1]}")
-            elif status == 4:
-                painter.drawText(option.rect, Qt.AlignCenter, f"{time[0]} - {time[1]}")
+        if role == Qt.DisplayRole:
+            return cell.get("text")
+        if role == Qt.BackgroundRole and "colour" in cell:
+            return QColor(cell["colour"])
+        if role == Qt.ForegroundRole and "text_colour" in cell:
+            return QColor(cell["text_colour"])
+        if role == STATUS_ROLE:
+            return cell.get("status")
+        if role == PAYLOAD_ROLE:
+            return cell.get("payload")
 
-        else:
-            super().paint(painter, option, index)
+        return None
 
 
-class Add_Assigned_Shift_Data_Employee(QStyledItemDelegate):
-    """
-    Fill out the employee-shifts grid with all shift times
-    """
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        """
+        Return the names shown along the top and side of the grid
+        """
+
+        if role != Qt.DisplayRole:
+            return None
+
+        labels = self.column_labels if orientation == Qt.Horizontal else self.row_labels
+        if 0 <= section < len(labels):
+            return labels[section]
+
+        return None
+
 
-    def __init__(self, target_cells, shifts, parent=None):
+    def flags(self, index):
         """
-        Setup target cells and shift data
+        Allow cells to be clicked and selected but not edited
         """
 
-        super().__init__(parent)
-        self.target_cells = target_cells
-        self.shifts = shifts  
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
 
 
-    def paint(self, painter, option, index):
+    def set_week(self, row_labels, column_labels, cells):
         """
-        Fill cells with correct information
+        Replace the contents of the grid, only updating the cells that changed if the layout is the same
         """
 
-        row, column = index.row(), index.column()
-        if (row, column) in self.target_cells:
-            
-            shift_id = self.shifts[row][-1][column]
-            time = Database_Controller.get_shift_times(shift_id)
-            status = Database_Controller.get_shift_status(self.shifts[row][0], shift_id)
-            if status == 4:
-                painter.fillRect(option.rect, QColor("#333333"))
-                painter.setPen(Qt.white)
-                painter.setFont(QFont("Cascadia Mono", 12, QFont.Bold))
-                painter.drawText(option.rect, Qt.AlignCenter, f"{time[0]} - {time[1]}")
-            else:
-                pass
+        if list(row_labels) != self.row_labels or list(column_labels) != self.column_labels:
+            self.beginResetModel()
+            self.row_labels = list(row_labels)
+            self.column_labels = list(column_labels)
+            self.cells = dict(cells)
+            self.loaded_rows = min(self.FETCH_BATCH_SIZE, len(self.row_labels))
+            self.endResetModel()
+            return
 
-        else:
-            super().paint(painter, option, index)
+        changed = [position for position in set(self.cells) | set(cells) if self.cells.get(position) != cells.get(position)]
+        self.cells = dict(cells)
 
+        for row, column in changed:
+            if row < self.loaded_rows:
+                index = self.index(row, column)
+                self.dataChanged.emit(index, index)
 
-class Add_Time_Off_Data(QStyledItemDelegate):
-    """
-    Fill out the time-off requests grid with all shift times
-    """
 
-    def __init__(self, target_cells, time_off, parent=None):
+    def update_cell(self, row, column, cell):
         """
-        Setup target cells and request data
+        Change a single cell of the grid
         """
 
-        super().__init__(parent)
-        self.target_cells = target_cells
-        self.timeoff = time_off 
+        if cell is None:
+            self.cells.pop((row, column), None)
+        else:
+            self.cells[(row, column)] = cell
+
+        if row < self.loaded_rows:
+            index = self.index(row, column)
+            self.dataChanged.emit(index, index)
+
+
+class Grid_Cell_Delegate(QStyledItemDelegate):
+    """
+    Draw grid cells using the text and colours stored in the model
+    """
+
+    CELL_FONT = QFont("Cascadia Mono", 12, QFont.Bold)
 
-        
     def paint(self, painter, option, index):
         """
         Fill cells with correct information
         """
 
-        row, column = index.row(), index.column()
-        if (row, column) in self.target_cells:
-            shift_data = self.timeoff[row][column]
-            start_date, end_date = shift_data[2], shift_data[3]
-            start_time, end_time = shift_data[4], shift_data[5]
-            if shift_data[-2] == 1:      
-                painter.fillRect(option.rect, QColor("#333333"))
-                painter.setPen(Qt.white)
-                painter.setFont(QFont("Cascadia Mono", 12, QFont.Bold))
-                painter.drawText(option.rect, Qt.AlignCenter, f"Pending: \n{start_date}\n-\n{end_date}")
-            elif shift_data[-2] == 2:            
-                painter.fillRect(option.rect, QColor("#1E831F"))
-                painter.setPen(Qt.black)
-                painter.setFont(QFont("Cascadia Mono", 12, QFont.Bold))
-                painter.drawText(option.rect, Qt.AlignCenter, f"Approved: \n{start_date}\n-\n{end_date}")
-            elif shift_data[-2] == 3:            
-                painter.fillRect(option.rect, QColor("#831E1E"))
-                painter.setPen(Qt.white)
-                painter.setFont(QFont("Cascadia Mono", 12, QFont.Bold))
-                painter.drawText(option.rect, Qt.AlignCenter, f"Rejected: \n{start_date}\n-\n{end_date}")
-        else:
+        text = index.data(Qt.DisplayRole)
+        if text is None:
             super().paint(painter, option, index)
+            return
+
+        painter.fillRect(option.rect, index.data(Qt.BackgroundRole) or QColor("#333333"))
+        painter.setPen(index.data(Qt.ForegroundRole) or QColor(Qt.white))
+        painter.setFont(self.CELL_FONT)
+        painter.drawText(option.rect, Qt.AlignCenter, text)
 
 
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    program = Stack()
-    program.showMaximized()
+    with Startup_Profiler.timed("startup", "QApplication"):
+        app = QApplication(sys.argv)
+    with Startup_Profiler.timed("startup", "Stack"):
+        program = Stack()
+    with Startup_Profiler.timed("startup", "Show window"):
+        program.showMaximized()
+
+    if PROFILE_STARTUP:
+        QTimer.singleShot(0, lambda: Startup_Profiler.write_report("startup_profile.txt", Database_Controller.get_lookup_cache_info()))
+        app.aboutToQuit.connect(lambda: Startup_Profiler.write_cache_report("startup_profile.txt", "Lookup caches at exit", Database_Controller.get_lookup_cache_info()))
+
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,124 @@
+import builtins, sys, time
+from contextlib import contextmanager
+
+PROCESS_START = time.perf_counter()
+
+enabled = False
+import_timings = []
+timings = []
+_import_stack = []
+_original_import = builtins.__import__
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    """
+    Time an import the first time a module is loaded, in the same way as python -X importtime.
+    """
+
+    if level != 0 or name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+
+    _import_stack.append(0)
+    start = time.perf_counter()
+
+    try:
+        module = _original_import(name, globals, locals, fromlist, level)
+
+    finally:
+        cumulative = time.perf_counter() - start
+        children = _import_stack.pop()
+        if _import_stack:
+            _import_stack[-1] += cumulative
+
+    import_timings.append((len(_import_stack), name, cumulative - children, cumulative))
+
+    return module
+
+
+def enable():
+    """
+    Start recording import, page construction and startup timings.
+    """
+
+    global enabled
+
+    enabled = True
+    builtins.__import__ = _timed_import
+
+
+def disable():
+    """
+    Stop recording import timings.
+    """
+
+    global enabled
+
+    enabled = False
+    builtins.__import__ = _original_import
+
+
+@contextmanager
+def timed(category, label):
+    """
+    Record how long the code inside the with block takes, if profiling is enabled.
+    """
+
+    if not enabled:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.append((category, label, time.perf_counter() - start))
+
+
+def cache_lines(title, cache_info):
+    """
+    Format the hit and miss counts of lru_cache functions, given as a dictionary of cache_info() results.
+    """
+
+    lines = [f"{title} (hits | misses | hit rate | size):"]
+    for name, info in sorted(cache_info.items()):
+        calls = info.hits + info.misses
+        hit_rate = info.hits / calls if calls else 0
+        lines.append(f"    {info.hits:10} | {info.misses:10} | {hit_rate:8.1%} | {info.currsize:5}  {name}")
+    lines.append("")
+
+    return lines
+
+
+def write_cache_report(filename, title, cache_info):
+    """
+    Add the hit and miss counts of lru_cache functions to the end of a report.
+    """
+
+    with open(filename, "a") as file:
+        file.write("\n".join(cache_lines(title, cache_info)) + "\n")
+
+
+def write_report(filename, cache_info=None):
+    """
+    Write the recorded timings, and the cache counts if given, to a file, slowest first within each section.
+    """
+
+    total = time.perf_counter() - PROCESS_START
+    lines = [f"Time from start to first event loop tick: {total * 1000:.1f} ms", ""]
+
+    for category in sorted({category for category, _, _ in timings}):
+        lines.append(f"{category.title()} timings:")
+        entries = sorted((entry for entry in timings if entry[0] == category), key=lambda entry: entry[2], reverse=True)
+        for _, label, seconds in entries:
+            lines.append(f"    {seconds * 1000:10.1f} ms  {label}")
+        lines.append("")
+
+    if cache_info is not None:
+        lines.extend(cache_lines("Lookup caches at startup", cache_info))
+
+    lines.append("Import timings (self ms | cumulative ms | module):")
+    for depth, name, self_time, cumulative in import_timings:
+        lines.append(f"    {self_time * 1000:10.1f} | {cumulative * 1000:10.1f} | {'  ' * depth}{name}")
+
+    with open(filename, "w") as file:
+        file.write("\n".join(lines) + "\n")